@@ -0,0 +1,93 @@
+import re
+
+"""알레르기 유발 물질 비트마스크 (식품의약품안전처 표시 대상 기준)"""
+
+## 순서가 곧 비트 위치이므로 항목은 뒤에만 추가할 것
+ALLERGENS = (
+    "난류", "우유", "메밀", "땅콩", "대두", "밀", "고등어", "게", "새우", "돼지고기",
+    "복숭아", "토마토", "아황산류", "호두", "닭고기", "쇠고기", "오징어", "조개류", "잣",
+)
+_BITS = {name: 1 << i for i, name in enumerate(ALLERGENS)}
+
+## 같은 알레르기를 가리키는 다른 표기
+_ALIASES = {
+    "계란": "난류", "달걀": "난류", "알류": "난류",
+    "콩": "대두", "소고기": "쇠고기", "돼지": "돼지고기", "닭": "닭고기",
+    "굴": "조개류", "전복": "조개류", "홍합": "조개류", "조개": "조개류",
+    "아황산": "아황산류",
+}
+## 음식 이름에 들어 있으면 해당 알레르기로 보는 단어 (알레르기 이름/다른 표기 중 두 글자 이상은 자동 포함)
+## "밀", "게", "잣"처럼 한 글자는 다른 단어에도 흔히 들어가서 (예: 밀감) 이름 전체 또는 단어 하나가 같을 때만 인정
+_NAME_KEYWORDS = {
+    "난류": ("메추리알",),
+    "우유": ("치즈", "요거트", "요구르트"),
+    "대두": ("두부", "두유", "된장", "청국장", "콩국"),
+    "밀": ("밀가루", "통밀", "소맥"),
+    "게": ("꽃게", "대게", "게장", "킹크랩"),
+    "돼지고기": ("삼겹살",),
+    "닭고기": ("닭가슴살", "닭다리", "닭갈비", "닭볶음", "닭안심", "치킨", "통닭"),
+    "쇠고기": ("한우", "차돌"),
+    "조개류": ("바지락", "가리비", "꼬막"),
+    "잣": ("잣죽",),
+}
+_SEPARATORS = re.compile(r"[,/·\s()\[\]]+")
+## 알레르기 입력에서 항목을 나누는 구분자 (공백이 들어간 항목 이름은 그대로 유지)
+_ITEM_SEPARATORS = re.compile(r"[,/·]+")
+
+
+def _bit(token: str) -> int:
+    return _BITS.get(_ALIASES.get(token, token), 0)
+
+
+def _keyword_bits() -> dict[str, int]:
+    keywords = {name: _BITS[name] for name in ALLERGENS}
+    keywords.update({alias: _BITS[name] for alias, name in _ALIASES.items()})
+    for name, words in _NAME_KEYWORDS.items():
+        keywords.update({word: _BITS[name] for word in words})
+    return {word: bit for word, bit in keywords.items() if len(word) > 1}
+
+
+_KEYWORD_BITS = _keyword_bits()
+
+
+## "땅콩, 우유" 같은 문자열을 비트마스크로 변환 (표시 대상이 아닌 항목은 unknown_names로 따로 처리)
+def to_mask(text: str | None) -> int:
+    if not text:
+        return 0
+    mask = 0
+    for token in _SEPARATORS.split(text):
+        mask |= _bit(token.strip())
+    return mask
+
+
+## 이름으로 추정한 비트마스크: 단어 하나가 알레르기 이름/다른 표기와 같거나 (예: "게"), 두 글자 이상 단어를 포함 (예: "땅콩버터")
+def name_mask(name: str | None) -> int:
+    if not name:
+        return 0
+    mask = to_mask(name)
+    for keyword, bit in _KEYWORD_BITS.items():
+        if keyword in name:
+            mask |= bit
+    return mask
+
+
+## 음식의 비트마스크: allergens 컬럼 + 이름으로 추정한 알레르기
+def food_mask(name: str | None, allergens: str | None) -> int:
+    return to_mask(allergens) | name_mask(name)
+
+
+## 비트가 없는 알레르기 항목 (예: "땅콩, 오이"의 "오이"), 이름이 같은 음식을 제외할 때 사용
+def unknown_names(text: str | None) -> tuple[str, ...]:
+    if not text:
+        return ()
+    names = []
+    for item in _ITEM_SEPARATORS.split(text):
+        for token in (item.strip(), *item.split()):
+            if token and not _bit(token) and token not in names:
+                names.append(token)
+    return tuple(names)
+
+
+## 비트마스크를 알레르기 이름 목록으로 변환
+def from_mask(mask: int) -> list[str]:
+    return [name for name, bit in _BITS.items() if mask & bit]
@@ -7,18 +7,41 @@ from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from app.models import User
 from app.dependencies import get_db
+from app.cache import TTLCache
+from app.allergens import unknown_names
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import os
+import threading
 
 """로그인 보안 관련 파일"""
 
+load_dotenv()
+
 ## JWT 토큰 스키마
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
+## 로그인이 선택인 엔드포인트용 (토큰이 없으면 None)
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login", auto_error=False)
+
+## 비밀번호 해싱 설정 (BCRYPT_ROUNDS보다 낮은 cost의 해시는 로그인 시 재해싱 대상)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+)
 
-## 비밀번호 해싱 설정
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+## bcrypt 전용 스레드 풀 (bcrypt는 GIL을 풀고 실행되므로 이벤트 루프를 막지 않음)
+HASH_WORKERS = int(os.getenv("BCRYPT_WORKERS", "4"))
+## 대기 + 실행 중인 해싱 작업 상한, 넘으면 503으로 거절
+HASH_QUEUE_LIMIT = int(os.getenv("BCRYPT_QUEUE_LIMIT", "256"))
+_hash_executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="bcrypt")
+_hash_lock = threading.Lock()
+_hash_stats = {"pending": 0, "running": 0, "completed": 0, "rejected": 0}
 
 ## JWT 설정
-load_dotenv()
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = "HS256"
 
@@ -33,6 +56,56 @@ def verify_password(plain_pwd, hased_pwd):
     return pwd_context.verify(plain_pwd, hased_pwd)
 
 
+## 해싱 풀 상태 (대기열 깊이 등)
+def hash_pool_stats() -> dict:
+    with _hash_lock:
+        return {"workers": HASH_WORKERS, "queue_limit": HASH_QUEUE_LIMIT, **_hash_stats}
+
+
+def _run_tracked(func, *args):
+    with _hash_lock:
+        _hash_stats["pending"] -= 1
+        _hash_stats["running"] += 1
+    try:
+        return func(*args)
+    finally:
+        with _hash_lock:
+            _hash_stats["running"] -= 1
+            _hash_stats["completed"] += 1
+
+
+## bcrypt 작업을 해싱 풀에서 실행하고 결과를 기다림
+async def _run_in_hash_pool(func, *args):
+    with _hash_lock:
+        if _hash_stats["pending"] + _hash_stats["running"] >= HASH_QUEUE_LIMIT:
+            _hash_stats["rejected"] += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="요청이 많아 잠시 후 다시 시도해주세요.",
+            )
+        _hash_stats["pending"] += 1
+    future = _hash_executor.submit(_run_tracked, func, *args)
+    future.add_done_callback(_release_if_cancelled)
+    return await asyncio.wrap_future(future)
+
+
+## 요청이 취소되어(연결 끊김 등) 실행 전에 대기열에서 빠진 작업은 _run_tracked가 실행되지 않으므로 여기서 pending 감소
+def _release_if_cancelled(future) -> None:
+    if future.cancelled():
+        with _hash_lock:
+            _hash_stats["pending"] -= 1
+
+
+## 비번 해싱 (async 핸들러용)
+async def get_password_hash_async(pwd: str) -> str:
+    return await _run_in_hash_pool(pwd_context.hash, pwd)
+
+
+## 비번 검증 + 해시가 오래되었으면 새 해시 반환 (async 핸들러용)
+async def verify_and_update_password_async(plain_pwd, hashed_pwd) -> tuple[bool, str | None]:
+    return await _run_in_hash_pool(pwd_context.verify_and_update, plain_pwd, hashed_pwd)
+
+
 ## JWT 토큰 생성
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
@@ -42,28 +115,95 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     return encoded_jwt
 
 
-## JWT 토큰 인증
-def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
-):
-    credential_exception = HTTPException(
+def _credential_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="유효하지 않은 인증 정보입니다.",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+## JWT 토큰만으로 user_id 추출 (DB 조회 없음, user_id만 필요한 엔드포인트용)
+def get_current_user_id(token: str = Depends(oauth2_scheme)) -> int:
+    return _decode_user_id(token)
+
+
+def _decode_user_id(token: str) -> int:
     try:
         ## 토큰을 decode 하여 user_id 추출
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id: str = payload.get("sub")
         if user_id is None:
-            raise credential_exception
+            raise _credential_exception()
+        return int(user_id)
+
+    except (JWTError, ValueError):
+        raise _credential_exception()
 
-    except JWTError:
-        raise credential_exception
 
+## JWT 토큰 인증 (수정하거나 관계(goal 등)가 필요한 엔드포인트용 ORM 객체)
+def get_current_user(
+    user_id: int = Depends(get_current_user_id), db: Session = Depends(get_db)
+):
     user = db.query(User).filter(User.user_id == user_id).first()
     ## 추출한 user_id가 없을 시
     if user is None:
-        raise credential_exception
+        raise _credential_exception()
 
     return user
+
+
+## 캐시에 저장하는 유저 정보 (세션과 무관한 읽기 전용 값)
+@dataclass(frozen=True)
+class UserPrincipal:
+    user_id: int
+    email: str
+    name: str
+    allergies: str | None
+    allergen_mask: int
+
+    ## 비트가 없는 알레르기 항목 (이름이 같은 음식을 제외)
+    @property
+    def allergen_names(self) -> tuple[str, ...]:
+        return unknown_names(self.allergies)
+
+
+## user_id별 유저 정보 캐시 (프로필 수정 시 invalidate_user로 제거)
+_user_cache = TTLCache(
+    maxsize=int(os.getenv("USER_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("USER_CACHE_TTL", "60")),
+)
+
+
+## JWT 토큰 인증 (캐시된 유저 정보, 캐시 미스일 때만 DB 조회)
+def get_current_principal(
+    user_id: int = Depends(get_current_user_id), db: Session = Depends(get_db)
+) -> UserPrincipal:
+    return _load_principal(user_id, db)
+
+
+## 토큰으로 유저 정보 확인 (로그인이 선택인 엔드포인트에서 로그인이 필요한 옵션을 쓸 때만 호출)
+def principal_from_token(token: str, db: Session) -> UserPrincipal:
+    return _load_principal(_decode_user_id(token), db)
+
+
+def _load_principal(user_id: int, db: Session) -> UserPrincipal:
+    principal = _user_cache.get(user_id)
+    if principal is not None:
+        return principal
+    user = db.query(User).filter(User.user_id == user_id).first()
+    if user is None:
+        raise _credential_exception()
+    principal = UserPrincipal(user.user_id, user.email, user.name, user.allergies, user.allergen_mask or 0)
+    _user_cache.set(user_id, principal)
+    return principal
+
+
+## 유저 정보가 바뀌었을 때 캐시 제거
+def invalidate_user(user_id: int) -> None:
+    _user_cache.pop(user_id)
+
+
+## 유저 캐시 적중/실패 횟수
+def user_cache_stats() -> dict:
+    return _user_cache.stats()
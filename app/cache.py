@@ -0,0 +1,67 @@
+from collections import OrderedDict
+import threading
+import time
+
+"""프로세스 내 캐시"""
+
+
+## TTL 만료 + LRU 제거 캐시 (스레드풀에서 동시에 접근해도 안전)
+## max_bytes를 주면 sizeof(value) 합계가 넘지 않도록 오래된 항목부터 제거
+class TTLCache:
+    def __init__(self, maxsize: int, ttl: float, max_bytes: int | None = None, sizeof=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof or (lambda value: 0)
+        self.hits = 0
+        self.misses = 0
+        self._bytes = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value) -> None:
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            size = self.sizeof(value)
+            self._data[key] = (time.monotonic() + self.ttl, value, size)
+            self._bytes += size
+            while len(self._data) > self.maxsize or (self.max_bytes is not None and self._bytes > self.max_bytes):
+                self._remove(next(iter(self._data)))
+
+    def pop(self, key) -> None:
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "bytes": self._bytes,
+            }
+
+    def _remove(self, key) -> None:
+        self._bytes -= self._data.pop(key)[2]
@@ -1,24 +1,117 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
+import asyncio
 import os
+import ssl
 
 ## .env 파일 로드
 load_dotenv()
 
-## .env에 정의된 DB_URL 불러오기
-DB_URL = (
+## .env에 정의된 DB_URL 불러오기 (DATABASE_URL이 있으면 우선, 벤치마크에서 SQLite 사용 시 등)
+DB_URL = os.getenv("DATABASE_URL") or (
     f"mysql+pymysql://{os.getenv("DB_USER")}:{os.getenv("DB_PASSWORD")}"
     f"@{os.getenv("DB_HOST")}:{os.getenv("DB_PORT")}/{os.getenv("DB_NAME")}"
 )
+IS_MYSQL = DB_URL.startswith("mysql")
+
+## 비동기 드라이버(aiomysql, SQLite는 aiosqlite)용 DB_URL
+ASYNC_DB_URL = (
+    DB_URL.replace("mysql+pymysql://", "mysql+aiomysql://", 1)
+    .replace("sqlite://", "sqlite+aiosqlite://", 1)
+)
+
+## 커넥션 풀 설정 (동기/비동기 엔진 공통, .env에서 조정 가능)
+POOL_OPTIONS = {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+    "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "3600")),
+    "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower() == "true",
+}
+
+
+## aiomysql용 SSL 설정 (PyMySQL의 {"ssl_disabled": False}와 같이 CA 검증 없이 암호화만 사용)
+def _async_ssl_context() -> ssl.SSLContext:
+    ctx = ssl.create_default_context()
+    ctx.check_hostname = False
+    ctx.verify_mode = ssl.CERT_NONE
+    return ctx
+
+
+## SQLite는 외래 키 검사가 기본으로 꺼져 있어서 MySQL과 같도록 연결마다 켬 (없는 음식의 재고 추가 등을 막음)
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+## 엔진은 처음 필요할 때 만듦 (import 시에는 DB에 접속하지 않음, 서버는 lifespan에서 생성)
+_engine: Engine | None = None
+_async_engine: AsyncEngine | None = None
+
+## 세션 팩토리, 엔진이 생성될 때 bind 설정
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
+## 비동기 세션 (commit 후에도 응답 직렬화에 객체를 쓸 수 있도록 expire_on_commit=False)
+AsyncSessionLocal = async_sessionmaker(class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+
+## SQLAlchemy 엔진 (CLI 등 서버 밖에서 DB를 쓸 때도 먼저 호출)
+def get_engine() -> Engine:
+    global _engine
+    if _engine is None:
+        _engine = create_engine(
+            DB_URL,
+            connect_args={"ssl": {"ssl_disabled": False}} if IS_MYSQL else {"check_same_thread": False},
+            **POOL_OPTIONS,
+        )
+        if not IS_MYSQL:
+            event.listen(_engine, "connect", _enable_sqlite_foreign_keys)
+        SessionLocal.configure(bind=_engine)
+    return _engine
+
+
+## 비동기 엔진 (async 핸들러에서 이벤트 루프를 막지 않도록 사용)
+def get_async_engine() -> AsyncEngine:
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_async_engine(
+            ASYNC_DB_URL,
+            connect_args={"ssl": _async_ssl_context()} if IS_MYSQL else {},
+            **POOL_OPTIONS,
+        )
+        if not IS_MYSQL:
+            event.listen(_async_engine.sync_engine, "connect", _enable_sqlite_foreign_keys)
+        AsyncSessionLocal.configure(bind=_async_engine)
+    return _async_engine
+
+
+## 풀에 pool_size만큼 커넥션을 미리 열어 둠 (첫 요청들이 TLS 연결 비용을 내지 않도록)
+async def warm_up_pools() -> None:
+    size = POOL_OPTIONS["pool_size"]
+    async_engine = get_async_engine()
+    async_conns = [await async_engine.connect() for _ in range(size)]
+    for conn in async_conns:
+        await conn.close()
+    await asyncio.to_thread(_warm_up_sync_pool, size)
+
+
+def _warm_up_sync_pool(size: int) -> None:
+    conns = [get_engine().connect() for _ in range(size)]
+    for conn in conns:
+        conn.close()
 
 
-## SQLAlchemy 엔진 생성
-engine = create_engine(DB_URL, connect_args={"ssl": {"ssl_disabled": False}})
+## 서버 종료 시 풀의 커넥션 정리
+async def dispose_engines() -> None:
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    if _engine is not None:
+        _engine.dispose()
 
-## engine을 세션과 연결, 세션을 통해서 DB와 상호작용 가능
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 ## ORM 모델이 상속받을 Base 클래스 생성.
 Base = declarative_base()
@@ -1,4 +1,4 @@
-from app.database import SessionLocal
+from app.database import AsyncSessionLocal, SessionLocal
 
 
 def get_db():
@@ -7,3 +7,8 @@ def get_db():
         yield db  # 세션 객체 반환
     finally:
         db.close()  # 요청이 끝나면 세션 종료
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:  # 비동기 세션 객체 생성
+        yield db  # 요청이 끝나면 async with가 세션 종료
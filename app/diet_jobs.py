@@ -0,0 +1,99 @@
+from dataclasses import dataclass, field
+import asyncio
+import os
+import time
+import uuid
+
+from app import diet_service, recommendation_cache
+from app.meal_planner import plan_meals
+from app.diet_service import DietInputs
+from app.gemini_client import GeminiError, ask_gemini
+
+"""AI 식단 추천 백그라운드 작업 (프로세스 내 작업 목록 + 동시 실행 수 제한)"""
+
+## 동시에 실행하는 추천 작업 수
+JOB_WORKERS = int(os.getenv("DIET_JOB_WORKERS", "4"))
+## 끝난 작업을 보관하는 시간 (초)
+JOB_TTL = float(os.getenv("DIET_JOB_TTL", "600"))
+
+
+@dataclass
+class DietJob:
+    job_id: str
+    user_id: int
+    key: str
+    status: str = "pending"
+    recommendation: str | None = None
+    detail: str | None = None
+    finished_at: float | None = None
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+_jobs: dict[str, DietJob] = {}
+## (user_id, 입력값 해시) -> 진행 중인 job_id, 같은 입력의 요청은 한 번만 Gemini 호출
+_inflight: dict[tuple[int, str], str] = {}
+_tasks = set()
+_workers = asyncio.Semaphore(JOB_WORKERS)
+
+
+def _finish(job: DietJob, status: str, recommendation: str | None = None, detail: str | None = None) -> None:
+    job.status = status
+    job.recommendation = recommendation
+    job.detail = detail
+    job.finished_at = time.monotonic()
+    job.done.set()
+
+
+async def _run(job: DietJob, inputs: DietInputs, plan: dict) -> None:
+    try:
+        async with _workers:
+            job.status = "running"
+            ai_response = await ask_gemini(diet_service.build_prompt(inputs, plan))
+        recommendation = ai_response.strip()
+        recommendation_cache.put(job.key, recommendation)
+        _finish(job, "done", recommendation=recommendation)
+    except GeminiError as e:
+        _finish(job, "failed", detail=str(e))
+    except Exception:
+        _finish(job, "failed", detail="식단 추천 중 오류가 발생했습니다.")
+        raise
+    finally:
+        _inflight.pop((job.user_id, job.key), None)
+
+
+## 보관 기간이 지난 완료 작업 정리
+def _prune() -> None:
+    expired_before = time.monotonic() - JOB_TTL
+    for job_id in [j.job_id for j in _jobs.values() if j.finished_at and j.finished_at < expired_before]:
+        del _jobs[job_id]
+
+
+## 작업 등록 (캐시에 있으면 바로 완료, 같은 입력의 작업이 진행 중이면 그 작업을 반환)
+def submit(user_id: int, inputs: DietInputs) -> DietJob:
+    _prune()
+    plan = plan_meals(inputs)
+    key = recommendation_cache.fingerprint(inputs, plan)
+    running_id = _inflight.get((user_id, key))
+    if running_id in _jobs:
+        return _jobs[running_id]
+
+    job = DietJob(job_id=uuid.uuid4().hex, user_id=user_id, key=key)
+    _jobs[job.job_id] = job
+    cached = recommendation_cache.get(key)
+    if cached is not None:
+        _finish(job, "done", recommendation=cached)
+        return job
+
+    _inflight[(user_id, key)] = job.job_id
+    task = asyncio.create_task(_run(job, inputs, plan))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return job
+
+
+## 유저 본인의 작업만 조회
+def get(job_id: str, user_id: int) -> DietJob | None:
+    job = _jobs.get(job_id)
+    if job is None or job.user_id != user_id:
+        return None
+    return job
@@ -0,0 +1,71 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app import models
+from app.inventory_repository import get_inventory_with_food
+from app.nutrition import get_daily_nutrition
+from app.timeutil import to_local_date
+
+"""AI 식단 추천 입력 데이터 및 프롬프트 생성"""
+
+
+## 식단 추천에 필요한 입력값
+@dataclass(frozen=True)
+class DietInputs:
+    goal_calories: int
+    eaten_calories: int
+    ## (음식 이름, 수량) 목록
+    items: tuple
+    ## 오늘 섭취한 (단백질, 탄수화물, 지방) g
+    eaten_macros: tuple = (0, 0, 0)
+    ## 식단 계산용 재고 (food_id, 이름, 수량, 1개당 열량, 단백질, 탄수화물, 지방)
+    foods: tuple = ()
+
+
+## 목표, 오늘 섭취량, 재고를 DB에서 읽어옴
+def load_diet_inputs(db: Session, user) -> DietInputs:
+    goal = db.query(models.Goal).filter_by(user_id=user.user_id).order_by(models.Goal.date.desc()).first()
+    if goal is None:
+        raise HTTPException(status_code=404, detail="목표 정보가 없습니다.")
+    today = to_local_date(datetime.now(timezone.utc))
+    today_intake = get_daily_nutrition(db, user.user_id, today, today)
+    total_eaten = int(today_intake[0].calories) if today_intake else 0
+    eaten_macros = (
+        tuple(float(getattr(today_intake[0], key)) for key in ("protein", "carbs", "fat")) if today_intake else (0, 0, 0)
+    )
+    ## 알레르기 음식은 DB에서 제외
+    safe_inventory = [
+        inv for inv in get_inventory_with_food(
+            db, user.user_id, exclude_mask=user.allergen_mask, exclude_names=user.allergen_names
+        )
+        if inv.food and inv.quantity > 0
+    ]
+    return DietInputs(
+        goal_calories=goal.weight * 30,
+        eaten_calories=total_eaten,
+        items=tuple((inv.food.name, inv.quantity) for inv in safe_inventory),
+        eaten_macros=eaten_macros,
+        foods=tuple(
+            (inv.food_id, inv.food.name, inv.quantity,
+             *(float(getattr(inv.food, f"{key}_per_unit") or 0) for key in ("calories", "protein", "carbs", "fat")))
+            for inv in safe_inventory
+        ),
+    )
+
+
+## 로컬 플래너 결과를 문장으로 표시 (Gemini 없이 응답할 때 사용)
+def format_plan(plan: dict) -> str:
+    lines = []
+    for meal in plan["meals"]:
+        foods = ", ".join(f"{item['name']} {item['quantity']}개" for item in meal["items"]) or "추천할 재고가 없습니다"
+        lines.append(f"{meal['meal_type']}: {foods} ({meal['calories']:g}kcal)")
+    return "\n".join(lines)
+
+
+## 로컬 플래너가 정한 식단을 Gemini가 자연스러운 문장으로 설명하도록 요청
+def build_prompt(inputs: DietInputs, plan: dict) -> str:
+    return f"""사용자의 목표 칼로리는 {inputs.goal_calories}kcal이며, 오늘 섭취한 칼로리는 {inputs.eaten_calories}kcal입니다.\n가지고 있는 재료로 계산한 식단은 다음과 같습니다:\n{format_plan(plan)}\n음식 구성과 양은 바꾸지 말고, 이 식단을 아침, 점심, 저녁별로 조리 방법과 함께 자연스럽게 설명해주세요."""
+
@@ -0,0 +1,148 @@
+from decimal import Decimal
+import os
+import threading
+import time
+import zlib
+
+import orjson
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.cache import TTLCache
+from app.database import SessionLocal
+from app.models import Food, FoodCatalogVersion
+
+"""음식 전체 목록(GET /foods) 캐시 및 ETag 관리"""
+
+## 응답에 포함할 컬럼 (FoodOut과 같은 순서)
+CATALOG_COLUMNS = (
+    Food.food_id, Food.name, Food.unit,
+    Food.calories_per_unit, Food.protein_per_unit, Food.carbs_per_unit, Food.fat_per_unit,
+    Food.allergens,
+)
+
+## DB의 음식 목록 버전을 다시 확인하는 간격 (초), 다른 워커/CLI 일괄 등록의 변경은 최대 이만큼 늦게 반영
+CHECK_INTERVAL = float(os.getenv("FOOD_CATALOG_CHECK_INTERVAL", "5"))
+
+## 이 프로세스의 캐시/인덱스가 반영한 DB 버전 (None이면 아직 읽지 않음)
+_version = None
+_checked_at = 0.0
+## 알레르기 제외 조건별 JSON 응답 (조건마다 목록 전체 크기이므로 바이트 합계로 제한, 버전이 바뀌면 비움)
+_cache = TTLCache(
+    maxsize=int(os.getenv("FOOD_CATALOG_CACHE_SIZE", "64")),
+    ttl=float(os.getenv("FOOD_CATALOG_CACHE_TTL", "3600")),
+    max_bytes=int(os.getenv("FOOD_CATALOG_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    sizeof=len,
+)
+_lock = threading.Lock()
+
+
+## 음식을 추가/수정하는 트랜잭션 안에서 호출 (커밋 전), DB 버전을 1 올리고 새 버전 반환
+def bump_version(db: Session) -> int:
+    table = FoodCatalogVersion.__table__
+    db.execute(update(table).where(table.c.id == 1).values(version=table.c.version + 1))
+    return db.scalar(select(table.c.version).where(table.c.id == 1)) or 0
+
+
+## 이 프로세스가 커밋한 변경을 캐시/인덱스에 직접 반영한 뒤 호출
+## 바로 이전 버전까지 반영돼 있었으면 다시 읽지 않고, 다른 워커의 변경이 사이에 있으면 다음 refresh에서 다시 읽음
+def mark_applied(version: int) -> None:
+    global _version, _checked_at
+    with _lock:
+        _cache.clear()
+        if _version is not None and _version == version - 1:
+            _version = version
+        else:
+            _checked_at = 0.0
+
+
+## 다음 refresh에서 무조건 다시 읽도록 표시 (일괄 등록처럼 여러 버전이 한꺼번에 바뀐 경우)
+def expire() -> None:
+    global _version, _checked_at
+    with _lock:
+        _version = None
+        _checked_at = 0.0
+        _cache.clear()
+
+
+## CHECK_INTERVAL마다 DB 버전을 확인, 바뀌었으면 캐시를 비우고 True 반환 (호출한 쪽에서 인덱스를 다시 만듦)
+## 스레드 하나만 True를 받음, 다시 만드는 동안 다른 요청은 예전 인덱스 사용
+def refresh(db: Session) -> bool:
+    global _version, _checked_at
+    now = time.monotonic()
+    if _version is not None and now - _checked_at < CHECK_INTERVAL:
+        return False
+    table = FoodCatalogVersion.__table__
+    version = db.scalar(select(table.c.version).where(table.c.id == 1)) or 0
+    with _lock:
+        if _version is not None and now - _checked_at < CHECK_INTERVAL:
+            return False
+        _checked_at = now
+        if version == _version:
+            return False
+        _version = version
+        _cache.clear()
+    return True
+
+
+## 현재 버전의 ETag (refresh 이후 DB 조회 없음, 알레르기 제외 조건마다 다른 값)
+## DB 버전만으로 만들어서 모든 워커가 같은 내용에 같은 ETag를 줌 (다른 워커로 가도 304)
+def current_etag(exclude_mask: int = 0, exclude_names: tuple[str, ...] = ()) -> str:
+    return _etag(_version, exclude_mask, exclude_names)
+
+
+def _etag(version: int | None, exclude_mask: int, exclude_names: tuple[str, ...]) -> str:
+    names = f"-{zlib.crc32(','.join(exclude_names).encode()):08x}" if exclude_names else ""
+    return f'"{version}-{exclude_mask}{names}"'
+
+
+## If-None-Match 헤더가 etag와 일치하는지 확인
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+## 영양 성분(Numeric)은 Decimal로 조회되므로 숫자로 직렬화
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"JSON으로 변환할 수 없는 값입니다: {type(value).__name__}")
+
+
+def _row_to_dict(row) -> dict:
+    return {column.key: value for column, value in zip(CATALOG_COLUMNS, row)}
+
+
+## exclude_mask의 알레르기 비트가 있는 음식, exclude_names와 이름이 같은 음식은 DB에서 제외
+def _catalog_query(exclude_mask: int, exclude_names: tuple[str, ...]):
+    query = select(*CATALOG_COLUMNS)
+    if exclude_mask:
+        query = query.where(Food.allergen_mask.op("&")(exclude_mask) == 0)
+    if exclude_names:
+        query = query.where(Food.name.not_in(exclude_names))
+    return query
+
+
+## 현재 버전의 직렬화된 JSON 응답 (버전, 알레르기 제외 조건별로 캐시, 용량을 넘으면 오래 안 쓴 조건부터 제거)
+def get_catalog_json(db: Session, exclude_mask: int = 0, exclude_names: tuple[str, ...] = ()) -> tuple[str, bytes]:
+    key = (exclude_mask, exclude_names)
+    with _lock:
+        version = _version
+        body = _cache.get(key)
+    if body is None:
+        rows = db.execute(_catalog_query(exclude_mask, exclude_names)).all()
+        body = orjson.dumps([_row_to_dict(row) for row in rows], default=_json_default)
+        with _lock:
+            if version == _version:
+                _cache.set(key, body)
+    return _etag(version, exclude_mask, exclude_names), body
+
+
+## NDJSON 스트리밍 (전체 응답을 메모리에 올리지 않음, 응답 중에 쓰는 별도 세션 사용)
+def iter_catalog_ndjson(exclude_mask: int = 0, exclude_names: tuple[str, ...] = (), batch_size: int = 1000):
+    with SessionLocal() as db:
+        result = db.execute(_catalog_query(exclude_mask, exclude_names).execution_options(yield_per=batch_size))
+        for row in result:
+            yield orjson.dumps(_row_to_dict(row), default=_json_default, option=orjson.OPT_APPEND_NEWLINE)
@@ -0,0 +1,141 @@
+import argparse
+import csv
+import math
+import time
+from typing import Iterable, Iterator
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import food_catalog
+from app.allergens import food_mask
+from app.models import Food
+from app.sql_utils import build_insert_ignore, build_upsert
+
+"""식품 영양 DB(CSV) 일괄 등록"""
+
+## CSV 컬럼명 -> foods 컬럼명
+CSV_COLUMNS = {
+    "대표명": "name",
+    "열량": "calories_per_unit",
+    "탄수화물": "carbs_per_unit",
+    "단백질": "protein_per_unit",
+    "지방": "fat_per_unit",
+}
+## 식품 DB 영양 성분 기준량 (g)
+DEFAULT_UNIT = 100
+DEFAULT_BATCH_SIZE = 1000
+## 영양 성분 상한 (foods 컬럼 Numeric(10, 2))
+MAX_NUTRIENT = 1e8
+
+
+## 잘못된 행에서 멈춘 일괄 등록 (이전 배치는 이미 커밋됨, rows/inserted: 커밋된 행 수/추가된 음식 수)
+class FoodImportError(ValueError):
+    def __init__(self, message: str, rows: int, inserted: int):
+        super().__init__(message)
+        self.rows = rows
+        self.inserted = inserted
+
+
+## 빈 값/"-"는 None, 숫자가 아니거나 NaN/inf, 음수, Numeric(10, 2) 범위를 넘는 값은 ValueError
+def _to_number(value: str | None):
+    if value is None or value.strip() in ("", "-"):
+        return None
+    number = round(float(value), 2)
+    if not math.isfinite(number) or not 0 <= number < MAX_NUTRIENT:
+        raise ValueError(f"영양 성분 값이 올바르지 않습니다: {value.strip()}")
+    return number
+
+
+## CSV 줄을 읽으면서 foods 행(dict)으로 변환 (전체 파일을 메모리에 올리지 않음)
+def iter_food_rows(lines: Iterable[str], unit: int = DEFAULT_UNIT) -> Iterator[dict]:
+    reader = csv.DictReader(lines)
+    missing = set(CSV_COLUMNS) - set(reader.fieldnames or [])
+    if missing:
+        raise ValueError(f"CSV에 필요한 컬럼이 없습니다: {', '.join(sorted(missing))}")
+    for record in reader:
+        name = (record["대표명"] or "").strip()
+        if not name:
+            continue
+        row = {"name": name[:100], "unit": unit, "allergen_mask": food_mask(name, None)}
+        for csv_column, column in CSV_COLUMNS.items():
+            if column != "name":
+                row[column] = _to_number(record[csv_column])
+        yield row
+
+
+## batch_size개씩 INSERT ... ON DUPLICATE KEY UPDATE (이름이 같으면 영양 정보 갱신), 배치마다 음식 목록 버전을 올리고 커밋
+## (실행 중인 서버의 워커들은 다음 버전 확인 때 검색 인덱스/목록 캐시를 다시 만듦)
+## allergen_mask는 새로 추가되는 음식에만 이름으로 채우고, 이미 있는 음식은 allergens 컬럼으로 만든 값을 유지
+## update_existing=False면 이름이 같은 음식은 건너뛰고 새 음식만 추가 (inserted: 추가된 수)
+## 잘못된 행이 있으면 FoodImportError (그 행이 든 배치만 취소되고 이전 배치는 남음)
+def import_foods(
+    db: Session, rows: Iterable[dict], batch_size: int = DEFAULT_BATCH_SIZE, update_existing: bool = True
+) -> dict:
+    table = Food.__table__
+    dialect_name = db.get_bind().dialect.name
+    if update_existing:
+        stmt = build_upsert(
+            dialect_name, table, ["name"],
+            replace=[c for c in CSV_COLUMNS.values() if c != "name"] + ["unit"],
+        )
+    else:
+        stmt = build_insert_ignore(dialect_name, table, ["name"])
+    started = time.perf_counter()
+    total = 0
+    inserted = 0
+    batch = []
+
+    def flush() -> None:
+        nonlocal total, inserted
+        new_names = _new_names(db, batch) if not update_existing else set()
+        db.execute(stmt, batch)
+        food_catalog.bump_version(db)
+        db.commit()
+        total += len(batch)
+        inserted += len(new_names)
+
+    try:
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                flush()
+                batch = []
+    except ValueError as e:
+        db.rollback()
+        raise FoodImportError(str(e), total, inserted) from e
+    if batch:
+        flush()
+    seconds = time.perf_counter() - started
+    stats = {"rows": total, "seconds": round(seconds, 3), "rows_per_sec": round(total / seconds, 1) if seconds else 0.0}
+    if not update_existing:
+        stats["inserted"] = inserted
+    return stats
+
+
+## 배치에서 아직 DB에 없는 이름 (MySQL은 CLIENT.FOUND_ROWS 때문에 건너뛴 행도 rowcount에 포함되므로 미리 조회해서 셈)
+def _new_names(db: Session, batch: list[dict]) -> set[str]:
+    names = {row["name"] for row in batch}
+    existing = db.scalars(select(Food.name).where(Food.name.in_(names))).all()
+    return names - set(existing)
+
+
+## CLI: python -m app.food_import cleaned_grouped_foodDB.csv --batch-size 1000
+def main():
+    parser = argparse.ArgumentParser(description="식품 영양 DB CSV를 foods 테이블에 일괄 등록합니다.")
+    parser.add_argument("csv_path")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--encoding", default="utf-8-sig")
+    parser.add_argument("--unit", type=int, default=DEFAULT_UNIT)
+    args = parser.parse_args()
+
+    from app.database import SessionLocal, get_engine
+
+    get_engine()
+    with open(args.csv_path, encoding=args.encoding, newline="") as f, SessionLocal() as db:
+        stats = import_foods(db, iter_food_rows(f, args.unit), args.batch_size)
+    print(f"{stats['rows']}개 등록 완료 ({stats['seconds']}초, {stats['rows_per_sec']} rows/sec)")
+
+
+if __name__ == "__main__":
+    main()
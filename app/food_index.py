@@ -0,0 +1,96 @@
+from collections import defaultdict
+import threading
+import unicodedata
+
+from sqlalchemy.orm import Session
+
+from app.models import Food
+
+"""음식 이름 검색용 메모리 인덱스 (자모 단위 n-gram 역색인)"""
+
+## 호환용 자음(ㄱ, ㄴ, ...)을 초성 자모로 변환하는 표 (입력 중인 "닭ㄱ" 같은 검색어 처리용)
+_COMPAT_CHOSEONG = {
+    "ㄱ": "ᄀ", "ㄲ": "ᄁ", "ㄴ": "ᄂ", "ㄷ": "ᄃ", "ㄸ": "ᄄ",
+    "ㄹ": "ᄅ", "ㅁ": "ᄆ", "ㅂ": "ᄇ", "ㅃ": "ᄈ", "ㅅ": "ᄉ",
+    "ㅆ": "ᄊ", "ㅇ": "ᄋ", "ㅈ": "ᄌ", "ㅉ": "ᄍ", "ㅊ": "ᄎ",
+    "ㅋ": "ᄏ", "ㅌ": "ᄐ", "ㅍ": "ᄑ", "ㅎ": "ᄒ",
+}
+
+
+## 호환용 모음(ㅏ~ㅣ)은 중성 자모와 순서가 같음
+def _compat_jamo(ch: str) -> str:
+    if ch in _COMPAT_CHOSEONG:
+        return _COMPAT_CHOSEONG[ch]
+    if "ㅏ" <= ch <= "ㅣ":
+        return chr(ord(ch) - 0x314F + 0x1161)
+    return ch
+
+
+## 소문자 + 한글 음절을 자모로 분해 ("닭" -> "ᄃ ᅡ ᆰ"), 입력 중인 음절도 부분 일치 가능
+def normalize(text: str) -> str:
+    decomposed = unicodedata.normalize("NFD", text.strip().lower())
+    return "".join(_compat_jamo(ch) for ch in decomposed)
+
+
+def _grams(text: str) -> set[str]:
+    grams = set(text)
+    grams.update(text[i:i + 2] for i in range(len(text) - 1))
+    return grams
+
+
+class FoodSearchIndex:
+    def __init__(self):
+        self.loaded = False
+        self._names = {}
+        self._postings = defaultdict(set)
+        self._lock = threading.Lock()
+
+    ## foods 테이블 전체로 인덱스를 새로 만듦
+    def load(self, db: Session) -> None:
+        rows = db.query(Food.food_id, Food.name, Food.allergen_mask).all()
+        names = {}
+        postings = defaultdict(set)
+        for food_id, name, mask in rows:
+            key = normalize(name)
+            names[food_id] = (name, key, mask)
+            for gram in _grams(key):
+                postings[gram].add(food_id)
+        with self._lock:
+            self._names = names
+            self._postings = postings
+            self.loaded = True
+
+    ## 새로 등록된 음식 추가
+    def add(self, food_id: int, name: str, mask: int = 0) -> None:
+        key = normalize(name)
+        with self._lock:
+            self._names[food_id] = (name, key, mask)
+            for gram in _grams(key):
+                self._postings[gram].add(food_id)
+
+    ## 부분 문자열 검색: 정확히 일치 > 앞부분 일치 > 앞쪽 위치 > 짧은 이름 순
+    ## exclude_mask의 알레르기 비트가 있는 음식, exclude_names와 이름이 같은 음식은 제외
+    def search(
+        self, query: str, limit: int, offset: int = 0, exclude_mask: int = 0, exclude_names: tuple[str, ...] = ()
+    ) -> list[tuple[int, str]]:
+        key = normalize(query)
+        if not key:
+            return []
+        grams = [key] if len(key) == 1 else [key[i:i + 2] for i in range(len(key) - 1)]
+        with self._lock:
+            postings = sorted((self._postings.get(gram, set()) for gram in grams), key=len)
+            candidates = set.intersection(*postings) if postings[0] else set()
+            ranked = []
+            for food_id in candidates:
+                name, name_key, mask = self._names[food_id]
+                if mask & exclude_mask or name in exclude_names:
+                    continue
+                pos = name_key.find(key)
+                if pos >= 0:
+                    ranked.append((name_key != key, pos, len(name_key), food_id, name))
+        ranked.sort()
+        return [(food_id, name) for *_, food_id, name in ranked[offset:offset + limit]]
+
+
+## 프로세스 전체에서 공유하는 인덱스 (서버 시작 시 load, add_food에서 add)
+food_index = FoodSearchIndex()
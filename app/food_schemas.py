@@ -1,6 +1,7 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from enum import Enum
-from typing import List, Dict, Optional
+from typing import Annotated, List, Dict, Optional
+from datetime import date, datetime
 
 
 # ====================== ENUM ======================
@@ -13,13 +14,17 @@ class MealType(str, Enum):
 
 # ====================== 음식 등록 ======================
 
+## 1단위당 영양 성분: DB 컬럼 Numeric(10, 2) 범위 안의 0 이상 유한한 값
+NutrientValue = Annotated[float, Field(ge=0, lt=1e8, allow_inf_nan=False)]
+
+
 class FoodCreate(BaseModel):
     name: str
     unit: int
-    calories_per_unit: int
-    protein_per_unit: int
-    carbs_per_unit: int
-    fat_per_unit: int
+    calories_per_unit: NutrientValue
+    protein_per_unit: NutrientValue
+    carbs_per_unit: NutrientValue
+    fat_per_unit: NutrientValue
     allergens: Optional[str] = None
 
 # ===================== 음식 조회 =========================
@@ -27,10 +32,10 @@ class FoodOut(BaseModel):
     food_id: int
     name: str
     unit: int
-    calories_per_unit: int
-    protein_per_unit: int
-    carbs_per_unit: int
-    fat_per_unit: int
+    calories_per_unit: NutrientValue
+    protein_per_unit: NutrientValue
+    carbs_per_unit: NutrientValue
+    fat_per_unit: NutrientValue
     allergens: Optional[str] 
 
 
@@ -41,6 +46,18 @@ class FoodSearchOut(BaseModel):
     name: str
 
 
+# ====================== 비슷한 음식 응답 ======================
+
+class SimilarFoodOut(BaseModel):
+    food_id: int
+    name: str
+    calories_per_unit: float
+    protein_per_unit: float
+    carbs_per_unit: float
+    fat_per_unit: float
+    distance: float
+
+
 # ====================== 재고 등록/조회 ======================
 
 class InventoryBase(BaseModel):
@@ -48,6 +65,10 @@ class InventoryBase(BaseModel):
     quantity: int
 
 
+class InventoryBulkCreate(BaseModel):
+    items: List[InventoryBase] = Field(min_length=1, max_length=1000)
+
+
 class InventoryOut(BaseModel):
     food_id: int
     food_name: str
@@ -64,6 +85,30 @@ class MealFoodItem(BaseModel):
 class MealCreate(BaseModel):
     meal_type: MealType
     items: List[MealFoodItem]
+    ## true면 먹은 수량만큼 재고에서 차감
+    consume_inventory: bool = False
+
+
+# ====================== 식사 기록 일괄 저장 요청/응답 ======================
+
+class MealBatchItem(MealCreate):
+    idempotency_key: str = Field(min_length=1, max_length=64)
+    client_datetime: Optional[datetime] = None
+
+
+class MealBatchCreate(BaseModel):
+    meals: List[MealBatchItem] = Field(min_length=1, max_length=1000)
+
+
+class MealBatchResult(BaseModel):
+    idempotency_key: str
+    status: str
+    meal_id: Optional[int] = None
+    detail: Optional[str] = None
+
+
+class MealBatchResponse(BaseModel):
+    results: List[MealBatchResult]
 
 
 # ====================== 식사 기록 수정 요청 ======================
@@ -79,20 +124,43 @@ class MealUpdate(BaseModel):
 class MealFoodOut(BaseModel):
     food_name: str
     quantity: int
-    calories: int
-    protein: int
-    carbs: int
-    fat: int
+    calories: float
+    protein: float
+    carbs: float
+    fat: float
 
 
 class MealOut(BaseModel):
     meal_id: int
     datetime: str
     meal_type: MealType
-    total: Dict[str, int]
+    total: Dict[str, float]
     foods: List[MealFoodOut]
 
 
+# ====================== 일별 영양 섭취 응답 ======================
+
+class DailyNutritionOut(BaseModel):
+    date: date
+    calories: float
+    protein: float
+    carbs: float
+    fat: float
+
+
+# ====================== 기간별 영양 섭취 요약 응답 ======================
+## 같은 인덱스끼리 한 행 (meal_type은 group_by=meal_type일 때만)
+
+class NutritionSummaryOut(BaseModel):
+    granularity: str
+    bucket: List[str]
+    meal_type: Optional[List[str]] = None
+    calories: List[float]
+    protein: List[float]
+    carbs: List[float]
+    fat: List[float]
+
+
 # ====================== 공통 메시지 응답 ======================
 
 class MessageResponse(BaseModel):
@@ -106,7 +174,49 @@ class FoodRegisterResponse(BaseModel):
     food_id: int
 
 
+# ====================== 음식 일괄 등록 응답 ======================
+
+class FoodBulkImportResponse(BaseModel):
+    message: str
+    rows: int
+    ## 새로 추가된 음식 수 (이름이 이미 있는 음식은 건너뜀)
+    inserted: int
+    seconds: float
+    rows_per_sec: float
+
+
 # ====================== AI 식단 추천 응답 ======================
 
+class DietPlanItemOut(BaseModel):
+    food_id: int
+    name: str
+    quantity: int
+
+
+class DietPlanMealOut(BaseModel):
+    meal_type: MealType
+    items: List[DietPlanItemOut]
+    calories: float
+    protein: float
+    carbs: float
+    fat: float
+
+
+class DietPlanOut(BaseModel):
+    target: Dict[str, float]
+    total: Dict[str, float]
+    meals: List[DietPlanMealOut]
+
+
 class AIDietResponse(BaseModel):
     recommendation: str
+    plan: Optional[DietPlanOut] = None
+
+
+# ====================== AI 식단 추천 작업 응답 ======================
+
+class DietJobOut(BaseModel):
+    job_id: str
+    status: str
+    recommendation: Optional[str] = None
+    detail: Optional[str] = None
@@ -0,0 +1,202 @@
+import threading
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.models import Food
+
+"""영양 성분이 비슷한 음식 검색용 메모리 인덱스 (열량/단백질/탄수화물/지방 벡터, NumPy)"""
+
+NUTRIENTS = ("calories", "protein", "carbs", "fat")
+_INITIAL_CAPACITY = 1024
+## 조건에 맞지 않는 음식의 거리에 더하는 값 (이 이상이면 제외된 음식)
+_EXCLUDED = np.float32(1e30)
+
+
+class FoodSimilarityIndex:
+    def __init__(self):
+        self.loaded = False
+        self._lock = threading.Lock()
+        self._reset(_INITIAL_CAPACITY)
+        self._scale = np.ones(len(NUTRIENTS), dtype=np.float32)
+        self._scaled_size = 0
+
+    def _reset(self, capacity: int) -> None:
+        self._size = 0
+        self._ids = np.zeros(capacity, dtype=np.int64)
+        ## 알레르기 종류가 31개보다 적어서 int32로 충분 (int64보다 비트 연산이 빠름)
+        self._masks = np.zeros(capacity, dtype=np.int32)
+        ## 1개당 영양 성분 원본 (제약 조건 비교용)과 성분별 표준편차로 나눈 벡터 (거리 계산용)
+        ## 성분별로 연속된 메모리에 두도록 (성분 수, 음식 수) 모양으로 저장
+        self._raw = np.zeros((len(NUTRIENTS), capacity), dtype=np.float32)
+        self._vectors = np.zeros((len(NUTRIENTS), capacity), dtype=np.float32)
+        self._norms = np.zeros(capacity, dtype=np.float32)
+        self._names = []
+        self._positions = {}
+        self._name_positions = {}
+
+    ## foods 테이블 전체로 행렬을 새로 만듦
+    def load(self, db: Session) -> None:
+        rows = db.query(
+            Food.food_id, Food.name, *(getattr(Food, f"{key}_per_unit") for key in NUTRIENTS), Food.allergen_mask
+        ).all()
+        self.load_rows((food_id, name, values, mask) for food_id, name, *values, mask in rows)
+
+    ## (food_id, 이름, (열량, 단백질, 탄수화물, 지방), 알레르기 비트마스크) 목록으로 행렬 생성
+    def load_rows(self, rows) -> None:
+        rows = list(rows)
+        raw = _finite_rows([values for _, _, values, _ in rows])
+        with self._lock:
+            self._reset(max(_INITIAL_CAPACITY, len(rows) * 2))
+            self._scale = _std_scale(raw)
+            self._scaled_size = len(rows)
+            for food_id, name, _, mask in rows:
+                self._append(food_id, name, mask)
+            self._set_rows(0, raw)
+            self.loaded = True
+
+    ## 새로 등록된 음식 추가 (행렬 전체를 다시 만들지 않고 끝에 한 행 추가, 공간이 부족하면 두 배로 늘림)
+    def add(self, food_id: int, name: str, values, mask: int = 0) -> None:
+        raw = _finite_rows([values])
+        with self._lock:
+            if food_id in self._positions:
+                position = self._positions[food_id]
+                self._name_positions.pop(self._names[position], None)
+                self._names[position] = name
+                self._name_positions[name] = position
+                self._masks[position] = mask or 0
+                self._set_rows(position, raw)
+                return
+            if self._size == len(self._ids):
+                self._grow()
+            position = self._size
+            self._append(food_id, name, mask)
+            self._set_rows(position, raw)
+            ## 빈 테이블로 시작한 경우 등 load 때의 표준편차가 대표성이 없으므로 음식 수가 두 배가 될 때마다 다시 계산
+            if self._size >= max(2 * self._scaled_size, 2):
+                self._rescale()
+
+    def _append(self, food_id: int, name: str, mask: int) -> None:
+        position = self._size
+        self._ids[position] = food_id
+        self._masks[position] = mask or 0
+        self._names.append(name)
+        self._positions[food_id] = position
+        self._name_positions[name] = position
+        self._size += 1
+
+    def _set_rows(self, start: int, raw: np.ndarray) -> None:
+        end = start + len(raw)
+        vectors = raw / self._scale
+        self._raw[:, start:end] = raw.T
+        self._vectors[:, start:end] = vectors.T
+        self._norms[start:end] = np.einsum("ij,ij->i", vectors, vectors)
+
+    ## 현재 음식 전체로 표준편차를 다시 구해 벡터 재계산 (새 배열에 만든 뒤 교체해서 조회 중인 요청에 영향 없음)
+    def _rescale(self) -> None:
+        raw = self._raw[:, :self._size].T
+        self._scale = _std_scale(raw)
+        self._scaled_size = self._size
+        vectors = np.zeros_like(self._vectors)
+        norms = np.zeros_like(self._norms)
+        scaled = raw / self._scale
+        vectors[:, :self._size] = scaled.T
+        norms[:self._size] = np.einsum("ij,ij->i", scaled, scaled)
+        self._vectors, self._norms = vectors, norms
+
+    ## 배열을 새로 만들어 복사 (이미 조회 중인 요청은 예전 배열을 그대로 사용)
+    def _grow(self) -> None:
+        capacity = len(self._ids) * 2
+        for attr in ("_ids", "_masks", "_norms", "_raw", "_vectors"):
+            old = getattr(self, attr)
+            new = np.zeros((*old.shape[:-1], capacity), dtype=old.dtype)
+            new[..., :self._size] = old[..., :self._size]
+            setattr(self, attr, new)
+
+    ## food_id와 영양 성분이 가장 가까운 음식 k개 (거리 오름차순), 없는 food_id면 KeyError
+    ## exclude_mask의 알레르기 비트가 있는 음식은 제외, bounds는 {성분: (최소, 최대)} (None이면 제한 없음)
+    ## less에 있는 성분은 기준 음식보다 적은 음식만, exclude_names와 이름이 같은 음식은 제외
+    def similar(
+        self, food_id: int, k: int, exclude_mask: int = 0, bounds: dict | None = None, less=(), exclude_names=()
+    ) -> list[dict]:
+        with self._lock:
+            position = self._positions[food_id]
+            size = self._size
+            named = [self._name_positions[name] for name in exclude_names if name in self._name_positions]
+            ids, masks, raw, vectors, norms, names = (
+                self._ids, self._masks, self._raw, self._vectors, self._norms, self._names
+            )
+        ## 이후에 추가되는 행은 size 뒤에 쓰이므로 잠금 없이 앞부분만 읽어도 안전
+        ## |a - b|^2 = |a|^2 - 2a·b + |b|^2 (|b|^2는 순위에 영향이 없어 마지막에만 더함)
+        distances = norms[:size] - 2 * (vectors[:, position] @ vectors[:, :size])
+        distances[position] = np.inf
+        distances[[i for i in named if i < size]] = np.inf
+        ## 조건마다 새 배열을 만들지 않고 하나의 bool 배열에 누적
+        excluded = None
+        scratch = np.empty(size, dtype=bool)
+
+        def exclude(condition):
+            nonlocal excluded
+            if excluded is None:
+                excluded = condition.copy()
+            else:
+                np.logical_or(excluded, condition, out=excluded)
+
+        if exclude_mask:
+            exclude(np.not_equal(np.bitwise_and(masks[:size], exclude_mask, dtype=np.int32), 0, out=scratch))
+        for key, (low, high) in (bounds or {}).items():
+            column = raw[NUTRIENTS.index(key), :size]
+            if low is not None:
+                exclude(np.less(column, low, out=scratch))
+            if high is not None:
+                exclude(np.greater(column, high, out=scratch))
+        for key in less:
+            column = raw[NUTRIENTS.index(key), :size]
+            exclude(np.greater_equal(column, column[position], out=scratch))
+        if excluded is not None:
+            ## bool 인덱스로 inf를 쓰면 제외 여부가 섞여 있을 때 분기 때문에 느려서 분기 없는 덧셈으로 처리
+            distances += excluded * _EXCLUDED
+
+        ## k번째 거리만 partition으로 구한 뒤 그 이하인 음식만 정렬 (전체 정렬/argpartition보다 빠름)
+        k = min(k, size)
+        if k == 0:
+            return []
+        kth = np.partition(distances, k - 1)[k - 1]
+        if kth >= _EXCLUDED:
+            candidates = np.flatnonzero(distances < _EXCLUDED)
+        else:
+            candidates = np.flatnonzero(distances <= kth)
+        candidates = candidates[np.argsort(distances[candidates], kind="stable")][:k]
+        squared = distances[candidates] + norms[position]
+        return [
+            {
+                "food_id": int(ids[i]),
+                "name": names[i],
+                **{f"{key}_per_unit": round(float(raw[j, i]), 2) for j, key in enumerate(NUTRIENTS)},
+                "distance": round(float(np.sqrt(max(d, 0.0))), 4),
+            }
+            for i, d in zip(candidates, squared)
+        ]
+
+
+## 영양 성분 목록을 (음식 수, 성분 수) float32 배열로 변환 (없는 값, NaN/inf, float32 범위를 넘는 값은 0)
+## 잘못된 값이 하나라도 섞이면 표준편차가 NaN이 되어 모든 음식의 거리가 NaN이 되므로 미리 제거
+def _finite_rows(rows) -> np.ndarray:
+    raw = np.array([[float(value or 0) for value in values] for values in rows], dtype=np.float64)
+    raw = raw.reshape(-1, len(NUTRIENTS))
+    raw[~np.isfinite(raw) | (np.abs(raw) > np.finfo(np.float32).max)] = 0.0
+    return raw.astype(np.float32)
+
+
+## 성분마다 단위가 달라서 (kcal vs g) 표준편차로 나눠서 비교 (음식이 1개 이하이거나 값이 모두 같으면 1)
+## 제곱 합이 float32 범위를 넘지 않도록 float64로 계산, 결과가 0이거나 유한하지 않으면 1
+def _std_scale(raw: np.ndarray) -> np.ndarray:
+    if len(raw) <= 1:
+        return np.ones(len(NUTRIENTS), dtype=np.float32)
+    scale = raw.std(axis=0, dtype=np.float64)
+    scale[(scale == 0) | ~np.isfinite(scale) | (scale > np.finfo(np.float32).max)] = 1.0
+    return scale.astype(np.float32)
+
+
+## 프로세스 전체에서 공유하는 인덱스 (서버 시작 시 load, add_food에서 add)
+food_similarity = FoodSimilarityIndex()
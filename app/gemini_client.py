@@ -1,24 +1,101 @@
 # app/gemini_client.py
-import requests
+import asyncio
 import os
+import random
+import time
+
+import httpx
 from dotenv import load_dotenv
 
+from app import metrics
+
 load_dotenv()
 
 API_KEY = os.getenv("GEMINI_API_KEY")
+## 테스트/벤치마크에서는 로컬 가짜 서버 주소로 바꿔서 사용
+BASE_URL = os.getenv("GEMINI_BASE_URL", "https://generativelanguage.googleapis.com")
+MODEL = os.getenv("GEMINI_MODEL", "gemini-1.5-pro-002")
+
+CONNECT_TIMEOUT = float(os.getenv("GEMINI_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("GEMINI_READ_TIMEOUT", "60"))
+## 동시에 진행할 수 있는 Gemini 호출 수 상한
+MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))
+MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "3"))
+## 재시도 전 대기 상한 (초), Retry-After가 이보다 길면 재시도하지 않고 실패로 처리
+MAX_RETRY_DELAY = float(os.getenv("GEMINI_MAX_RETRY_DELAY", "8"))
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class GeminiError(Exception):
+    pass
+
+
+_client: httpx.AsyncClient | None = None
+_semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+
 
+## 커넥션을 재사용하는 공용 클라이언트 (처음 호출 시 생성)
+def _get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            base_url=BASE_URL,
+            timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=MAX_CONCURRENCY, max_keepalive_connections=MAX_CONCURRENCY),
+        )
+    return _client
 
-def ask_gemini(prompt: str):
+
+## 서버 종료 시 커넥션 정리
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+## 지수 백오프 + full jitter (Retry-After 헤더가 있으면 우선, MAX_RETRY_DELAY보다 길면 None = 재시도 안 함)
+def _backoff(attempt: int, retry_after: str | None) -> float | None:
+    if retry_after and retry_after.isdigit():
+        delay = float(retry_after)
+        return delay if delay <= MAX_RETRY_DELAY else None
+    return random.uniform(0, min(MAX_RETRY_DELAY, 0.5 * 2 ** attempt))
+
+
+## 호출 한 번 (동시 호출 수 제한은 요청 중에만 적용, 재시도 대기 중에는 자리를 비워 둠)
+async def _post(url: str, body: dict) -> httpx.Response:
+    async with _semaphore:
+        started = time.perf_counter()
+        try:
+            return await _get_client().post(url, params={"key": API_KEY}, json=body)
+        finally:
+            metrics.record_gemini(time.perf_counter() - started)
+
+
+async def ask_gemini(prompt: str) -> str:
     if not API_KEY:
-        raise Exception("❗ GEMINI_API_KEY가 .env에 설정되어 있지 않습니다.")
+        raise GeminiError("❗ GEMINI_API_KEY가 .env에 설정되어 있지 않습니다.")
 
-    url = f"https://generativelanguage.googleapis.com/v1/models/gemini-1.5-pro-002:generateContent?key={API_KEY}"  # ✅ 변수명 수정
-    headers = {"Content-Type": "application/json"}
+    url = f"/v1/models/{MODEL}:generateContent"
     body = {"contents": [{"parts": [{"text": prompt}]}]}
 
-    response = requests.post(url, headers=headers, json=body)
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            response = await _post(url, body)
+        except httpx.TransportError as e:
+            if attempt == MAX_RETRIES:
+                raise GeminiError(f"Gemini 호출 실패: {e!r}")
+            await asyncio.sleep(_backoff(attempt, None))
+            continue
+        if response.status_code in RETRY_STATUS and attempt < MAX_RETRIES:
+            delay = _backoff(attempt, response.headers.get("retry-after"))
+            if delay is not None:
+                await asyncio.sleep(delay)
+                continue
+        break
+
     if response.status_code != 200:
-        raise Exception(f"Gemini 호출 실패: {response.status_code} - {response.text}")
+        raise GeminiError(f"Gemini 호출 실패: {response.status_code} - {response.text}")
 
     data = response.json()
     return data["candidates"][0]["content"]["parts"][0]["text"]
@@ -0,0 +1,64 @@
+from sqlalchemy import case, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, contains_eager
+
+from app.models import Food, UserFoodInventory
+from app.sql_utils import build_upsert
+
+"""재고 조회/변경 관련 DB 접근 함수"""
+
+
+## 유저의 재고를 음식 정보와 함께 한 번에 조회하는 쿼리 (동기/비동기 세션 공통)
+## exclude_mask가 있으면 해당 알레르기 비트가 있는 음식, exclude_names가 있으면 이름이 같은 음식은 DB에서 제외
+## food_id 순으로 정렬 (식단 플래너가 동점일 때 앞의 음식을 고르므로 같은 재고면 항상 같은 식단이 되도록)
+def inventory_with_food_query(user_id: int, exclude_mask: int = 0, exclude_names: tuple[str, ...] = ()):
+    query = (
+        select(UserFoodInventory)
+        .outerjoin(UserFoodInventory.food)
+        .options(contains_eager(UserFoodInventory.food))
+        .where(UserFoodInventory.user_id == user_id)
+        .order_by(UserFoodInventory.food_id)
+    )
+    if exclude_mask:
+        query = query.where(Food.allergen_mask.op("&")(exclude_mask) == 0)
+    if exclude_names:
+        query = query.where(Food.name.not_in(exclude_names))
+    return query
+
+
+def get_inventory_with_food(
+    db: Session, user_id: int, exclude_mask: int = 0, exclude_names: tuple[str, ...] = ()
+) -> list[UserFoodInventory]:
+    return list(db.scalars(inventory_with_food_query(user_id, exclude_mask, exclude_names)))
+
+
+## get_inventory_with_food의 비동기 버전 (async 핸들러용)
+async def get_inventory_with_food_async(
+    db: AsyncSession, user_id: int, exclude_mask: int = 0, exclude_names: tuple[str, ...] = ()
+) -> list[UserFoodInventory]:
+    return list(await db.scalars(inventory_with_food_query(user_id, exclude_mask, exclude_names)))
+
+
+## 음식별 수량을 한 번의 INSERT ... ON DUPLICATE KEY UPDATE quantity = quantity + 추가 수량으로 반영
+## 동시에 들어온 추가 요청도 DB에서 원자적으로 더해짐 (호출한 쪽의 트랜잭션 안에서 실행)
+async def add_inventory_items(db: AsyncSession, user_id: int, quantities: dict[int, int]) -> None:
+    if not quantities:
+        return
+    stmt = build_upsert(
+        db.get_bind().dialect.name, UserFoodInventory.__table__, ["user_id", "food_id"], increment=["quantity"]
+    )
+    await db.execute(stmt, [{"user_id": user_id, "food_id": food_id, "quantity": q} for food_id, q in quantities.items()])
+
+
+## 음식별 수량을 한 번의 UPDATE로 차감 (0 아래로는 내려가지 않음, 재고에 없는 음식은 무시)
+def consume_inventory_items(db: Session, user_id: int, quantities: dict[int, int]) -> None:
+    if not quantities:
+        return
+    amount = case(quantities, value=UserFoodInventory.food_id, else_=0)
+    remaining = UserFoodInventory.quantity - amount
+    db.execute(
+        update(UserFoodInventory)
+        .where(UserFoodInventory.user_id == user_id, UserFoodInventory.food_id.in_(quantities))
+        .values(quantity=case((remaining > 0, remaining), else_=0))
+        .execution_options(synchronize_session=False)
+    )
@@ -1,30 +1,119 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, Response, UploadFile
+from fastapi.responses import ORJSONResponse, PlainTextResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone, date as date_class
+import asyncio
+import codecs
+import io
+import json
+import logging
+import os
 from typing import List
 
-from app import models, user_schemas, food_schemas, auth
-from app.models import Meal, Food, MealFood, User
+from app import (
+    models, user_schemas, food_schemas, auth, migrations, food_catalog, food_import, diet_service,
+    recommendation_cache, diet_jobs, metrics
+)
+from app.models import Meal
 from app.food_schemas import (
     MealCreate, MealOut, InventoryOut, MealFoodOut,
     FoodRegisterResponse, MessageResponse, AIDietResponse,
-    FoodSearchOut, MealUpdate, FoodOut
+    FoodSearchOut, MealUpdate, FoodOut, DailyNutritionOut, NutritionSummaryOut, FoodBulkImportResponse,
+    MealBatchCreate, MealBatchResponse, DietJobOut, SimilarFoodOut
+)
+from app.database import SessionLocal, dispose_engines, get_async_engine, get_engine, warm_up_pools
+from app.dependencies import get_db, get_async_db
+from app.inventory_repository import add_inventory_items, consume_inventory_items, get_inventory_with_food_async
+from app.food_index import food_index
+from app.food_similarity import food_similarity
+from app.meal_repository import (
+    get_meal_page, get_meal_totals, resolve_foods, build_meal_food_row, insert_meal_foods, apply_meal_food_diff,
+    find_meals_by_keys, insert_meals
+)
+from app.timeutil import local_day_range
+from app.nutrition import (
+    apply_daily_delta, apply_daily_deltas, diff_nutrients, get_daily_nutrition, get_nutrition_summary, sum_nutrients
 )
-from app.database import engine
-from app.dependencies import get_db
-from app.gemini_client import ask_gemini
+from app.allergens import food_mask, to_mask
+from app.responses import model_response
+from app.meal_planner import plan_meals
+from app.gemini_client import ask_gemini, GeminiError, close_client as close_gemini_client
+
+logger = logging.getLogger(__name__)
+
+## 서버 시작 시 마이그레이션 적용 여부 (false면 배포 단계에서 python -m app.migrations로 따로 실행)
+MIGRATE_ON_STARTUP = os.getenv("DB_MIGRATE_ON_STARTUP", "true").lower() == "true"
+## 서버 시작 시 커넥션 풀을 미리 채울지 여부
+POOL_WARMUP = os.getenv("DB_POOL_WARMUP", "false").lower() == "true"
+
+
+## DB의 음식 목록 버전이 바뀌었으면 (다른 워커의 추가, CLI 일괄 등록 등) 검색/비슷한 음식 인덱스를 다시 만듦
+def sync_food_caches(db: Session) -> None:
+    if food_catalog.refresh(db):
+        food_index.load(db)
+        food_similarity.load(db)
+
+
+## 음식 검색/비슷한 음식 인덱스 생성 (실패해도 서버는 시작, 첫 검색 때 다시 시도)
+def load_food_index() -> None:
+    try:
+        with SessionLocal() as db:
+            sync_food_caches(db)
+    except SQLAlchemyError:
+        food_catalog.expire()
+        logger.warning("음식 검색 인덱스를 만들지 못했습니다. 첫 검색 때 다시 시도합니다.", exc_info=True)
+
+
+## 엔진 생성, 마이그레이션, 풀 준비, 검색 인덱스 생성은 import가 아니라 서버 시작 시에 실행
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    engine = get_engine()
+    async_engine = get_async_engine()
+    if metrics.ENABLED:
+        metrics.instrument_engine(engine)
+        metrics.instrument_engine(async_engine.sync_engine)
+    if MIGRATE_ON_STARTUP:
+        applied = await run_in_threadpool(migrations.upgrade, engine)
+        if applied:
+            logger.info("마이그레이션 적용: %s", ", ".join(applied))
+    if POOL_WARMUP:
+        await warm_up_pools()
+    await run_in_threadpool(load_food_index)
+    yield
+    await close_gemini_client()
+    await dispose_engines()
+
+
+## 기본 응답 클래스: orjson으로 인코딩
+app = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
+
+## METRICS_ENABLED=true일 때 요청/SQL/Gemini 측정
+if metrics.ENABLED:
+    app.middleware("http")(metrics.metrics_middleware)
+
+
+## 검증 오류 응답도 orjson으로 인코딩 (기본 핸들러는 입력값 NaN/Infinity를 그대로 담아서 인코딩에 실패하고 500이 됨)
+@app.exception_handler(RequestValidationError)
+async def validation_exception_handler(request: Request, exc: RequestValidationError):
+    return ORJSONResponse(status_code=422, content={"detail": jsonable_encoder(exc.errors())})
 
-app = FastAPI()
-models.Base.metadata.create_all(engine)
 
 @app.post("/signup", status_code=201, response_model=user_schemas.UserResponse)
-async def signup(user: user_schemas.UserCreate, db: Session = Depends(get_db)):
-    existing_user = db.query(models.User).filter(models.User.email == user.email).first()
+async def signup(user: user_schemas.UserCreate, db: AsyncSession = Depends(get_async_db)):
+    existing_user = await db.scalar(select(models.User.user_id).where(models.User.email == user.email))
     if existing_user:
         raise HTTPException(status_code=400, detail="이미 존재하는 이메일입니다.")
-    hashed_pw = auth.get_password_hash(user.password)
+    ## 해싱을 기다리는 동안 커넥션을 풀에 반납
+    await db.rollback()
+    hashed_pw = await auth.get_password_hash_async(user.password)
     new_user = models.User(
         email=user.email,
         hashed_pw=hashed_pw,
@@ -34,33 +123,42 @@ async def signup(user: user_schemas.UserCreate, db: Session = Depends(get_db)):
         weight=user.weight,
         age=user.age,
         allergies=user.allergies,
+        allergen_mask=to_mask(user.allergies),
+        goal=models.Goal(weight=user.goal.weight, date=user.goal.date),
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-    new_goal = models.Goal(user_id=new_user.user_id, weight=user.goal.weight, date=user.goal.date)
-    db.add(new_goal)
-    db.commit()
-    db.refresh(new_goal)
-    new_user.goal = new_goal
+    await db.commit()
     return new_user
 
 @app.post("/login", status_code=200, response_model=user_schemas.LoginResponse)
-async def login(db: Session = Depends(get_db), request: OAuth2PasswordRequestForm = Depends()):
-    user = db.query(models.User).filter(models.User.email == request.username).first()
-    if not user or not auth.verify_password(request.password, user.hashed_pw):
+async def login(db: AsyncSession = Depends(get_async_db), request: OAuth2PasswordRequestForm = Depends()):
+    user = (await db.execute(
+        select(models.User.user_id, models.User.hashed_pw).where(models.User.email == request.username)
+    )).first()
+    if not user:
         raise HTTPException(status_code=401, detail="이메일 또는 비밀번호가 틀렸습니다.")
+    ## bcrypt 검증을 기다리는 동안 커넥션을 풀에 반납 (동시 로그인이 풀 크기보다 많아도 풀 타임아웃이 나지 않도록)
+    await db.rollback()
+    verified, new_hash = await auth.verify_and_update_password_async(request.password, user.hashed_pw)
+    if not verified:
+        raise HTTPException(status_code=401, detail="이메일 또는 비밀번호가 틀렸습니다.")
+    if new_hash:
+        ## bcrypt cost가 올라간 경우 로그인 시 새 해시로 교체
+        await db.execute(update(models.User).where(models.User.user_id == user.user_id).values(hashed_pw=new_hash))
+        await db.commit()
     token = auth.create_access_token(data={"sub": str(user.user_id)})
     return {"access_token": token, "token_type": "bearer"}
 
 @app.get("/profile", response_model=user_schemas.UserResponse)
-async def read_users_me(current_user: models.User = Depends(auth.get_current_user)):
+def read_users_me(current_user: models.User = Depends(auth.get_current_user)):
     return current_user
 
 @app.patch("/profile/allergies", response_model=MessageResponse)
 def update_allergies(allergies: str, db: Session = Depends(get_db), current_user: models.User = Depends(auth.get_current_user)):
     current_user.allergies = allergies
+    current_user.allergen_mask = to_mask(allergies)
     db.commit()
+    auth.invalidate_user(current_user.user_id)
     return {"message": "알레르기 정보가 업데이트되었습니다"}
 
 @app.patch("/profile/edit-profile", response_model=MessageResponse)
@@ -78,155 +176,393 @@ def edit_profile(update_data: user_schemas.UserUpdate, db: Session = Depends(get
             setattr(current_user, field, value)
     db.commit()
     db.refresh(current_user)
+    auth.invalidate_user(current_user.user_id)
     return {"message": "프로필 정보가 업데이트되었습니다"}
 
 @app.post("/foods", response_model=FoodRegisterResponse)
 def add_food(
     food: food_schemas.FoodCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    current_user: auth.UserPrincipal = Depends(auth.get_current_principal)
 ):
-    print("current_user_id:", current_user.name)
-    new_food = models.Food(**food.dict())
+    logger.debug("add_food user_id=%s", current_user.user_id)
+    new_food = models.Food(**food.dict(), allergen_mask=food_mask(food.name, food.allergens))
     db.add(new_food)
-    db.commit()
+    try:
+        db.flush()
+        version = food_catalog.bump_version(db)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="이미 등록된 음식 이름입니다.")
+    food_index.add(new_food.food_id, new_food.name, new_food.allergen_mask)
+    food_similarity.add(new_food.food_id, new_food.name, (
+        new_food.calories_per_unit, new_food.protein_per_unit, new_food.carbs_per_unit, new_food.fat_per_unit
+    ), new_food.allergen_mask)
+    food_catalog.mark_applied(version)
     return {"message": "음식이 등록되었습니다", "food_id": new_food.food_id}
 
+## 새 음식만 추가 (이미 있는 음식의 영양 정보는 바꾸지 않음, 수정은 CLI 일괄 등록 후 식사 기록 재계산으로)
+## batch_size행마다 커밋하므로 잘못된 행이 있으면 그 앞의 배치까지만 등록됨 (400 응답에 등록된 행 수 포함)
+@app.post("/foods/bulk", response_model=FoodBulkImportResponse)
+def add_foods_bulk(
+    file: UploadFile,
+    batch_size: int = Query(food_import.DEFAULT_BATCH_SIZE, ge=1, le=10000),
+    encoding: str = "utf-8-sig",
+    unit: int = Query(food_import.DEFAULT_UNIT, ge=1),
+    db: Session = Depends(get_db),
+    user_id: int = Depends(auth.get_current_user_id)
+):
+    try:
+        codecs.lookup(encoding)
+    except LookupError:
+        raise HTTPException(status_code=400, detail=f"지원하지 않는 인코딩입니다: {encoding}")
+    lines = io.TextIOWrapper(file.file, encoding=encoding, newline="")
+    try:
+        stats = food_import.import_foods(db, food_import.iter_food_rows(lines, unit), batch_size, update_existing=False)
+    except food_import.FoodImportError as e:
+        committed = f" (앞의 {e.rows}행은 이미 등록되었습니다, 새 음식 {e.inserted}개)" if e.rows else ""
+        raise HTTPException(status_code=400, detail=f"{e}{committed}")
+    finally:
+        food_catalog.expire()
+        sync_food_caches(db)
+    return {"message": "음식 일괄 등록 완료", **stats}
+
+## 음식별 추가 수량을 한 번의 upsert로 저장 (없는 음식이면 404)
+async def save_inventory(db: AsyncSession, user_id: int, quantities: dict[int, int]) -> None:
+    try:
+        await add_inventory_items(db, user_id, quantities)
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=404, detail="해당 음식이 존재하지 않습니다.")
+
+## 같은 음식이 여러 번 오면 수량을 합침
+def sum_quantities(items) -> dict[int, int]:
+    quantities = {}
+    for item in items:
+        quantities[item.food_id] = quantities.get(item.food_id, 0) + item.quantity
+    return quantities
+
 @app.post("/inventory", response_model=MessageResponse)
-def add_inventory(data: food_schemas.InventoryBase, db: Session = Depends(get_db), current_user: models.User = Depends(auth.get_current_user)):
-    item = db.query(models.UserFoodInventory).filter_by(user_id=current_user.user_id, food_id=data.food_id).first()
-    if item:
-        item.quantity += data.quantity
-    else:
-        item = models.UserFoodInventory(user_id=current_user.user_id, **data.dict())
-        db.add(item)
-    db.commit()
+async def add_inventory(data: food_schemas.InventoryBase, db: AsyncSession = Depends(get_async_db), user_id: int = Depends(auth.get_current_user_id)):
+    await save_inventory(db, user_id, {data.food_id: data.quantity})
     return {"message": "재고가 추가되었습니다"}
 
+@app.post("/inventory/bulk", response_model=MessageResponse)
+async def add_inventory_bulk(data: food_schemas.InventoryBulkCreate, db: AsyncSession = Depends(get_async_db), user_id: int = Depends(auth.get_current_user_id)):
+    await save_inventory(db, user_id, sum_quantities(data.items))
+    return {"message": f"재고 {len(data.items)}건이 추가되었습니다"}
+
 @app.get("/inventory", response_model=List[InventoryOut])
-def get_inventory(db: Session = Depends(get_db), current_user: models.User = Depends(auth.get_current_user)):
-    print("current_user_id:", current_user.name)
-    inventories = db.query(models.UserFoodInventory).filter_by(user_id=current_user.user_id).all()
-    print("inventories count:", len(inventories))
-    result = []
-    for inv in inventories:
-        food = db.query(models.Food).filter_by(food_id=inv.food_id).first()
-        result.append({"food_id": inv.food_id, "food_name": food.name if food else "Unknown", "quantity": inv.quantity})
-    return result
+async def get_inventory(
+    exclude_allergens: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: auth.UserPrincipal = Depends(auth.get_current_principal)
+):
+    exclude_mask, exclude_names = allergen_exclusion(exclude_allergens, current_user)
+    inventories = await get_inventory_with_food_async(db, current_user.user_id, exclude_mask, exclude_names)
+    logger.debug("get_inventory user_id=%s count=%d", current_user.user_id, len(inventories))
+    return model_response(List[InventoryOut], [
+        {"food_id": inv.food_id, "food_name": inv.food.name if inv.food else "Unknown", "quantity": inv.quantity}
+        for inv in inventories
+    ])
 
 @app.post("/meals", response_model=MessageResponse)
-def add_meal(meal: MealCreate, db: Session = Depends(get_db), current_user: User = Depends(auth.get_current_user)):
-    new_meal = Meal(user_id=current_user.user_id, meal_type=meal.meal_type, datetime=datetime.now(timezone.utc))
+def add_meal(meal: MealCreate, db: Session = Depends(get_db), user_id: int = Depends(auth.get_current_user_id)):
+    foods = resolve_foods(db, (item.food_id for item in meal.items))
+    if any(item.food_id not in foods for item in meal.items):
+        raise HTTPException(status_code=404, detail="해당 음식이 존재하지 않습니다.")
+    new_meal = Meal(user_id=user_id, meal_type=meal.meal_type, datetime=datetime.now(timezone.utc))
     db.add(new_meal)
     db.flush()
-    for item in meal.items:
-        food = db.query(Food).filter(Food.food_id == item.food_id).first()
-        if not food:
-            raise HTTPException(status_code=404, detail="해당 음식이 존재하지 않습니다.")
-        meal_food = MealFood(
-            meal_id=new_meal.meal_id,
-            food_id=food.food_id,
-            quantity=item.quantity,
-            calories=(food.calories_per_unit or 0) * item.quantity,
-            protein=(food.protein_per_unit or 0) * item.quantity,
-            carbs=(food.carbs_per_unit or 0) * item.quantity,
-            fat=(food.fat_per_unit or 0) * item.quantity
-        )
-        db.add(meal_food)
+    rows = [build_meal_food_row(new_meal.meal_id, foods[item.food_id], item.quantity) for item in meal.items]
+    insert_meal_foods(db, rows)
+    apply_daily_delta(db, user_id, new_meal.datetime, sum_nutrients(rows))
+    if meal.consume_inventory:
+        consume_inventory_items(db, user_id, sum_quantities(meal.items))
     db.commit()
     return {"message": "한 끼 저장 완료"}
 
+@app.post("/meals/batch", response_model=MealBatchResponse)
+def add_meals_batch(batch: MealBatchCreate, db: Session = Depends(get_db), user_id: int = Depends(auth.get_current_user_id)):
+    now = datetime.now(timezone.utc)
+    foods = resolve_foods(db, (item.food_id for meal in batch.meals for item in meal.items))
+    saved = find_meals_by_keys(db, user_id, {meal.idempotency_key for meal in batch.meals})
+
+    results = []
+    new_meals = {}
+    for meal in batch.meals:
+        key = meal.idempotency_key
+        result = {"idempotency_key": key}
+        meal_datetime = meal.client_datetime or now
+        if meal_datetime.tzinfo is not None:
+            meal_datetime = meal_datetime.astimezone(timezone.utc).replace(tzinfo=None)
+        missing = [item.food_id for item in meal.items if item.food_id not in foods]
+        if key in saved or key in new_meals:
+            result.update(status="duplicate", meal_id=saved.get(key))
+        elif missing:
+            result.update(status="error", detail=f"음식 ID {missing[0]}가 존재하지 않습니다.")
+        elif meal_datetime > now.replace(tzinfo=None):
+            result.update(status="error", detail="식사 시각이 현재 시각보다 늦을 수 없습니다.")
+        else:
+            result["status"] = "created"
+            new_meals[key] = (meal, meal_datetime)
+        results.append(result)
+
+    meal_ids = insert_meals(db, user_id, [
+        {"idempotency_key": key, "meal_type": meal.meal_type, "datetime": meal_datetime}
+        for key, (meal, meal_datetime) in new_meals.items()
+    ])
+    rows = []
+    deltas = []
+    for key, (meal, meal_datetime) in new_meals.items():
+        meal_rows = [build_meal_food_row(meal_ids[key], foods[item.food_id], item.quantity) for item in meal.items]
+        rows.extend(meal_rows)
+        deltas.append((meal_datetime, sum_nutrients(meal_rows)))
+    insert_meal_foods(db, rows)
+    apply_daily_deltas(db, user_id, deltas)
+    consume_inventory_items(db, user_id, sum_quantities(
+        item for meal, _ in new_meals.values() if meal.consume_inventory for item in meal.items
+    ))
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="같은 키로 동시에 저장 중입니다. 다시 시도해주세요.")
+
+    for result in results:
+        if result["status"] == "created":
+            result["meal_id"] = meal_ids[result["idempotency_key"]]
+        elif result["status"] == "duplicate" and result.get("meal_id") is None:
+            result["meal_id"] = meal_ids.get(result["idempotency_key"])
+    return {"results": results}
+
 @app.get("/meals", response_model=List[MealOut])
-def get_meals(date: str = None, meal_type: str = None, db: Session = Depends(get_db), current_user: models.User = Depends(auth.get_current_user)):
-    query = db.query(models.Meal).filter(models.Meal.user_id == current_user.user_id)
+async def get_meals(
+    date: str = None,
+    meal_type: str = None,
+    tz: str = None,
+    cursor: str = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+    user_id: int = Depends(auth.get_current_user_id)
+):
+    filters = []
     if date:
         try:
             date_obj = datetime.strptime(date, "%Y-%m-%d").date()
-            query = query.filter(func.date(models.Meal.datetime) == date_obj)
         except ValueError:
             raise HTTPException(status_code=400, detail="날짜 형식은 YYYY-MM-DD여야 합니다.")
+        try:
+            start, end = local_day_range(date_obj, tz)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        filters.append(models.Meal.datetime >= start)
+        filters.append(models.Meal.datetime < end)
     if meal_type:
-        query = query.filter(models.Meal.meal_type == meal_type)
-    meals = query.order_by(models.Meal.datetime.desc()).all()
-    result = []
-    for meal in meals:
-        total = {"calories": 0, "protein": 0, "carbs": 0, "fat": 0}
-        foods = []
-        for mf in meal.meal_foods:
-            foods.append({
-                "food_name": mf.food.name,
-                "quantity": mf.quantity,
-                "calories": mf.calories,
-                "protein": mf.protein,
-                "carbs": mf.carbs,
-                "fat": mf.fat
-            })
-            total["calories"] += mf.calories or 0
-            total["protein"] += mf.protein or 0
-            total["carbs"] += mf.carbs or 0
-            total["fat"] += mf.fat or 0
-        result.append({
+        filters.append(models.Meal.meal_type == meal_type)
+    try:
+        meals, next_cursor = await get_meal_page(db, user_id, filters, cursor, limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="잘못된 커서입니다.")
+    totals = await get_meal_totals(db, [meal.meal_id for meal in meals])
+    empty_total = {"calories": 0, "protein": 0, "carbs": 0, "fat": 0}
+    return model_response(List[MealOut], [
+        {
             "meal_id": meal.meal_id,
             "datetime": meal.datetime.isoformat(),
             "meal_type": meal.meal_type,
-            "total": total,
-            "foods": foods
-        })
-    return result
+            "total": totals.get(meal.meal_id, empty_total),
+            "foods": [
+                {
+                    "food_name": mf.food.name,
+                    "quantity": mf.quantity,
+                    "calories": mf.calories,
+                    "protein": mf.protein,
+                    "carbs": mf.carbs,
+                    "fat": mf.fat
+                }
+                for mf in meal.meal_foods
+            ]
+        }
+        for meal in meals
+    ], headers={"X-Next-Cursor": next_cursor} if next_cursor else None)
+
+@app.get("/nutrition/daily", response_model=List[DailyNutritionOut])
+def get_nutrition_daily(
+    from_date: date_class = Query(alias="from"),
+    to_date: date_class = Query(alias="to"),
+    db: Session = Depends(get_db),
+    user_id: int = Depends(auth.get_current_user_id)
+):
+    if from_date > to_date:
+        raise HTTPException(status_code=400, detail="조회 시작일은 종료일보다 늦을 수 없습니다.")
+    return model_response(List[DailyNutritionOut], get_daily_nutrition(db, user_id, from_date, to_date))
+
+@app.get("/nutrition/summary", response_model=NutritionSummaryOut)
+def get_nutrition_summary_view(
+    from_date: date_class = Query(alias="from"),
+    to_date: date_class = Query(alias="to"),
+    granularity: str = Query("day", pattern="^(day|week|month)$"),
+    group_by: str = Query(None, pattern="^meal_type$"),
+    tz: str = None,
+    db: Session = Depends(get_db),
+    user_id: int = Depends(auth.get_current_user_id)
+):
+    if from_date > to_date:
+        raise HTTPException(status_code=400, detail="조회 시작일은 종료일보다 늦을 수 없습니다.")
+    try:
+        summary = get_nutrition_summary(db, user_id, from_date, to_date, granularity, group_by == "meal_type", tz)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return model_response(NutritionSummaryOut, summary)
 
 @app.get("/ai-diet", response_model=AIDietResponse)
-def get_ai_diet(db: Session = Depends(get_db), current_user: models.User = Depends(auth.get_current_user)):
-    user = current_user
-    goal = db.query(models.Goal).filter_by(user_id=user.user_id).order_by(models.Goal.date.desc()).first()
-    meals = db.query(models.Meal).filter(models.Meal.user_id == user.user_id).all()
-    total_eaten = 0
-    for meal in meals:
-        for mf in meal.meal_foods:
-            total_eaten += mf.calories or 0
-    inventory = db.query(models.UserFoodInventory).filter_by(user_id=user.user_id).all()
-    food_items = [
-        {"name": db.query(models.Food).filter_by(food_id=inv.food_id).first().name, "quantity": inv.quantity}
-        for inv in inventory if db.query(models.Food).filter_by(food_id=inv.food_id).first()
-    ]
-    def filter_allergens(user, items):
-        if not user.allergies:
-            return items
-        allergy_list = [a.strip() for a in user.allergies.split(",")]
-        return [item for item in items if item["name"] not in allergy_list]
-    safe_items = filter_allergens(user, food_items)
-    prompt = f"""사용자의 목표 칼로리는 {goal.weight * 30}kcal이며, 오늘 섭취한 칼로리는 {total_eaten}kcal입니다.\n현재 가지고 있는 재료는 다음과 같습니다:\n{', '.join([f'{item["name"]}({item["quantity"]}개)' for item in safe_items])}\n이 재료와 정보를 바탕으로 아침, 점심, 저녁 식단을 추천해주세요."""
-    ai_response = ask_gemini(prompt)
-    return {"recommendation": ai_response.strip()}
+async def get_ai_diet(
+    response: Response,
+    phrase: bool = False,
+    db: Session = Depends(get_db),
+    current_user: auth.UserPrincipal = Depends(auth.get_current_principal)
+):
+    inputs = await run_in_threadpool(diet_service.load_diet_inputs, db, current_user)
+    ## 식단은 로컬 플래너로 계산, phrase=true일 때만 Gemini로 설명 문장 생성
+    plan = plan_meals(inputs)
+    if not phrase:
+        return {"recommendation": diet_service.format_plan(plan), "plan": plan}
+    key = recommendation_cache.fingerprint(inputs, plan)
+    recommendation = recommendation_cache.get(key)
+    response.headers["X-Cache"] = "HIT" if recommendation is not None else "MISS"
+    if recommendation is None:
+        try:
+            ai_response = await ask_gemini(diet_service.build_prompt(inputs, plan))
+        except GeminiError as e:
+            raise HTTPException(status_code=502, detail=str(e))
+        recommendation = ai_response.strip()
+        recommendation_cache.put(key, recommendation)
+    return {"recommendation": recommendation, "plan": plan}
+
+@app.post("/ai-diet/jobs", status_code=202, response_model=DietJobOut)
+async def create_ai_diet_job(db: Session = Depends(get_db), current_user: auth.UserPrincipal = Depends(auth.get_current_principal)):
+    inputs = await run_in_threadpool(diet_service.load_diet_inputs, db, current_user)
+    job = diet_jobs.submit(current_user.user_id, inputs)
+    return job_out(job)
+
+@app.get("/ai-diet/jobs/{job_id}", response_model=DietJobOut)
+def get_ai_diet_job(job_id: str, user_id: int = Depends(auth.get_current_user_id)):
+    job = diet_jobs.get(job_id, user_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="해당 작업이 존재하지 않습니다.")
+    return job_out(job)
+
+@app.get("/ai-diet/jobs/{job_id}/events")
+async def stream_ai_diet_job(job_id: str, user_id: int = Depends(auth.get_current_user_id)):
+    job = diet_jobs.get(job_id, user_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="해당 작업이 존재하지 않습니다.")
+
+    ## 완료될 때까지 15초마다 keep-alive 주석을 보내고, 완료되면 결과를 한 번 보냄
+    async def events():
+        while not job.done.is_set():
+            try:
+                await asyncio.wait_for(job.done.wait(), timeout=15)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+        yield f"event: {job.status}\ndata: {json.dumps(job_out(job), ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+def job_out(job: diet_jobs.DietJob) -> dict:
+    return {"job_id": job.job_id, "status": job.status, "recommendation": job.recommendation, "detail": job.detail}
+
+## exclude_allergens=true일 때 로그인한 유저의 (알레르기 비트마스크, 비트가 없는 알레르기 항목)
+def allergen_exclusion(exclude_allergens: bool, current_user: auth.UserPrincipal | None) -> tuple[int, tuple[str, ...]]:
+    if not exclude_allergens:
+        return 0, ()
+    if current_user is None:
+        raise HTTPException(status_code=401, detail="알레르기 제외 조회는 로그인이 필요합니다.", headers={"WWW-Authenticate": "Bearer"})
+    return current_user.allergen_mask, current_user.allergen_names
+
+## 공개 엔드포인트용: exclude_allergens=true일 때만 토큰으로 유저 확인 (false면 Authorization 헤더를 보지 않음)
+def optional_allergen_exclusion(
+    exclude_allergens: bool = False,
+    token: str | None = Depends(auth.optional_oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> tuple[int, tuple[str, ...]]:
+    if not exclude_allergens:
+        return 0, ()
+    return allergen_exclusion(True, auth.principal_from_token(token, db) if token else None)
 
 @app.get("/foods/search", response_model=List[FoodSearchOut])
-def search_foods(name: str, db: Session = Depends(get_db)):
-    results = db.query(models.Food).filter(models.Food.name.ilike(f"%{name}%")).all()
-    return [{"food_id": food.food_id, "name": food.name} for food in results]
+def search_foods(
+    name: str,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    exclusion: tuple[int, tuple[str, ...]] = Depends(optional_allergen_exclusion)
+):
+    exclude_mask, exclude_names = exclusion
+    sync_food_caches(db)
+    if not food_index.loaded:
+        food_index.load(db)
+    results = food_index.search(name, limit, offset, exclude_mask, exclude_names)
+    return model_response(List[FoodSearchOut], [{"food_id": food_id, "name": food_name} for food_id, food_name in results])
+
+## 영양 성분(열량/단백질/탄수화물/지방)이 비슷한 음식 k개, max_*/min_protein으로 범위 제한
+## less를 지정하면 그 성분이 기준 음식보다 적은 음식만 (예: less=fat -> 더 담백한 대체 음식)
+@app.get("/foods/{food_id}/similar", response_model=List[SimilarFoodOut])
+def similar_foods(
+    food_id: int,
+    k: int = Query(10, ge=1, le=100),
+    max_calories: float = Query(None, ge=0),
+    max_carbs: float = Query(None, ge=0),
+    max_fat: float = Query(None, ge=0),
+    min_protein: float = Query(None, ge=0),
+    less: str = Query(None, pattern="^(calories|protein|carbs|fat)$"),
+    db: Session = Depends(get_db),
+    exclusion: tuple[int, tuple[str, ...]] = Depends(optional_allergen_exclusion)
+):
+    exclude_mask, exclude_names = exclusion
+    sync_food_caches(db)
+    if not food_similarity.loaded:
+        food_similarity.load(db)
+    bounds = {
+        "calories": (None, max_calories),
+        "protein": (min_protein, None),
+        "carbs": (None, max_carbs),
+        "fat": (None, max_fat),
+    }
+    bounds = {key: bound for key, bound in bounds.items() if bound != (None, None)}
+    try:
+        results = food_similarity.similar(food_id, k, exclude_mask, bounds, (less,) if less else (), exclude_names)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="해당 음식이 존재하지 않습니다.")
+    return model_response(List[SimilarFoodOut], results)
 
 
 @app.get("/foods", response_model=List[FoodOut])
-def list_all_foods(db: Session = Depends(get_db)):
-    foods = db.query(models.Food).all()
-    return [
-        {
-            "food_id": food.food_id,
-            "name": food.name,
-            "unit": food.unit,
-            "calories_per_unit": food.calories_per_unit,
-            "protein_per_unit": food.protein_per_unit,
-            "carbs_per_unit": food.carbs_per_unit,
-            "fat_per_unit": food.fat_per_unit,
-            "allergens": food.allergens
-        }
-        for food in foods
-    ]
+def list_all_foods(
+    request: Request,
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    db: Session = Depends(get_db),
+    exclusion: tuple[int, tuple[str, ...]] = Depends(optional_allergen_exclusion)
+):
+    exclude_mask, exclude_names = exclusion
+    if format == "ndjson":
+        return StreamingResponse(food_catalog.iter_catalog_ndjson(exclude_mask, exclude_names), media_type="application/x-ndjson")
+    sync_food_caches(db)
+    etag = food_catalog.current_etag(exclude_mask, exclude_names)
+    if food_catalog.etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    etag, body = food_catalog.get_catalog_json(db, exclude_mask, exclude_names)
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
 
 
 @app.patch("/meals/edit-meal", response_model=MessageResponse)
-def edit_mealfood(update_data: MealUpdate, db: Session = Depends(get_db), current_user: models.User = Depends(auth.get_current_user)):
+def edit_mealfood(update_data: MealUpdate, db: Session = Depends(get_db), user_id: int = Depends(auth.get_current_user_id)):
     meal = db.query(models.Meal).filter(
         models.Meal.meal_id == update_data.meal_id,
-        models.Meal.user_id == current_user.user_id
+        models.Meal.user_id == user_id
     ).first()
 
     if not meal:
@@ -236,24 +572,36 @@ def edit_mealfood(update_data: MealUpdate, db: Session = Depends(get_db), curren
         meal.meal_type = update_data.meal_type
 
     if update_data.items is not None:
-        db.query(models.MealFood).filter(models.MealFood.meal_id == meal.meal_id).delete()
-        db.flush()
+        quantities = sum_quantities(update_data.items)
+        foods = resolve_foods(db, quantities)
+        missing = [food_id for food_id in quantities if food_id not in foods]
+        if missing:
+            raise HTTPException(status_code=404, detail=f"음식 ID {missing[0]}가 존재하지 않습니다.")
 
-        for item in update_data.items:
-            food = db.query(models.Food).filter_by(food_id=item.food_id).first()
-            if not food:
-                raise HTTPException(status_code=404, detail=f"음식 ID {item.food_id}가 존재하지 않습니다.")
-
-            new_meal_food = models.MealFood(
-                meal_id=meal.meal_id,
-                food_id=food.food_id,
-                quantity=item.quantity,
-                calories=food.calories_per_unit * item.quantity,
-                protein=food.protein_per_unit * item.quantity,
-                carbs=food.carbs_per_unit * item.quantity,
-                fat=food.fat_per_unit * item.quantity
-            )
-            db.add(new_meal_food)
+        before, after = apply_meal_food_diff(db, meal, quantities, foods)
+        delta = diff_nutrients(sum_nutrients(after), sum_nutrients(before))
+        apply_daily_delta(db, user_id, meal.datetime, delta)
 
     db.commit()
     return {"message": "식사 정보가 수정되었습니다."}
+
+
+## 풀/캐시 상태 중 계속 늘어나기만 하는 값 (counter로 출력, 나머지는 gauge)
+METRIC_COUNTER_STATS = {"completed", "rejected", "hits", "misses"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def get_metrics():
+    gauges = {}
+    counters = {}
+    for prefix, stats in (
+        ("app_bcrypt_pool", auth.hash_pool_stats()),
+        ("app_user_cache", auth.user_cache_stats()),
+        ("app_recommendation_cache", recommendation_cache.stats()),
+    ):
+        for name, value in stats.items():
+            if name in METRIC_COUNTER_STATS:
+                counters[f"{prefix}_{name}_total"] = value
+            else:
+                gauges[f"{prefix}_{name}"] = value
+    return PlainTextResponse(metrics.render(gauges, counters), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,82 @@
+import numpy as np
+
+from app.diet_service import DietInputs
+
+"""재고로 아침/점심/저녁 식단을 계산하는 로컬 플래너 (NumPy 벡터 연산, Gemini 호출 없음)"""
+
+## 남은 열량을 끼니별로 나누는 비율
+MEAL_SPLIT = (("아침", 0.3), ("점심", 0.4), ("저녁", 0.3))
+## 하루 열량 중 단백질/탄수화물/지방 비율과 g당 열량
+MACRO_RATIO = np.array([0.2, 0.5, 0.3])
+KCAL_PER_GRAM = np.array([4.0, 4.0, 9.0])
+## 오차 가중치 (열량, 단백질, 탄수화물, 지방), 열량을 가장 우선
+WEIGHTS = np.array([2.0, 1.0, 1.0, 1.0])
+## 한 끼에 같은 음식은 최대 이 개수까지
+MAX_PORTIONS = 3
+KEYS = ("calories", "protein", "carbs", "fat")
+
+
+## 오늘 남은 (열량, 단백질, 탄수화물, 지방) 목표
+def remaining_targets(inputs: DietInputs) -> np.ndarray:
+    macro_goal = inputs.goal_calories * MACRO_RATIO / KCAL_PER_GRAM
+    remaining = np.concatenate((
+        [inputs.goal_calories - inputs.eaten_calories],
+        macro_goal - np.asarray(inputs.eaten_macros, dtype=float),
+    ))
+    return np.maximum(remaining, 0.0)
+
+
+## 한 끼 목표에 가장 가까운 음식별 개수 (1개 추가/제거 중 오차가 가장 줄어드는 쪽을 반복 선택)
+## 오차는 목표 대비 상대 오차의 가중 제곱합, 모든 후보를 한 번에 계산
+def solve_meal(nutrients: np.ndarray, stock: np.ndarray, target: np.ndarray) -> np.ndarray:
+    scale = np.sqrt(WEIGHTS) / np.maximum(target, 1.0)
+    a = nutrients * scale
+    norms = np.einsum("ij,ij->i", a, a)
+    limit = np.minimum(stock, MAX_PORTIONS)
+    portions = np.zeros(len(stock), dtype=np.int64)
+    residual = target * scale
+    for _ in range(int(limit.sum()) * 2):
+        dot = a @ residual
+        ## ||r - a_i||^2 = ||r||^2 - (2 a_i·r - ||a_i||^2), ||r + a_i||^2 = ||r||^2 - (-2 a_i·r - ||a_i||^2)
+        add_gain = np.where(portions < limit, 2 * dot - norms, -np.inf)
+        remove_gain = np.where(portions > 0, -2 * dot - norms, -np.inf)
+        best_add = int(np.argmax(add_gain))
+        best_remove = int(np.argmax(remove_gain))
+        if max(add_gain[best_add], remove_gain[best_remove]) <= 1e-9:
+            break
+        if add_gain[best_add] >= remove_gain[best_remove]:
+            portions[best_add] += 1
+            residual -= a[best_add]
+        else:
+            portions[best_remove] -= 1
+            residual += a[best_remove]
+    return portions
+
+
+def _totals(values: np.ndarray) -> dict:
+    return {key: round(float(value), 1) for key, value in zip(KEYS, values)}
+
+
+## 재고(알레르기 제외)로 아침/점심/저녁 구성 계산, 같은 입력이면 항상 같은 결과
+def plan_meals(inputs: DietInputs) -> dict:
+    target = remaining_targets(inputs)
+    foods = [food for food in inputs.foods if food[2] > 0]
+    nutrients = np.array([food[3:7] for food in foods], dtype=float).reshape(-1, 4)
+    stock = np.array([food[2] for food in foods], dtype=np.int64)
+
+    meals = []
+    planned = np.zeros(4)
+    for meal_type, ratio in MEAL_SPLIT:
+        portions = solve_meal(nutrients, stock, target * ratio) if foods else np.zeros(0, dtype=np.int64)
+        stock = stock - portions
+        meal_total = portions @ nutrients if foods else np.zeros(4)
+        planned += meal_total
+        meals.append({
+            "meal_type": meal_type,
+            "items": [
+                {"food_id": foods[i][0], "name": foods[i][1], "quantity": int(portions[i])}
+                for i in np.flatnonzero(portions)
+            ],
+            **_totals(meal_total),
+        })
+    return {"target": _totals(target), "total": _totals(planned), "meals": meals}
@@ -0,0 +1,153 @@
+from datetime import datetime
+
+from sqlalchemy import and_, case, delete, func, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+
+from app.models import Food, Meal, MealFood
+from app.nutrition import NUTRIENTS
+
+"""식사 기록 조회/저장 관련 DB 접근 함수"""
+
+
+## 커서 문자열 생성 ("<datetime ISO>_<meal_id>")
+def encode_meal_cursor(meal: Meal) -> str:
+    return f"{meal.datetime.isoformat()}_{meal.meal_id}"
+
+
+## 커서 문자열 해석, 형식이 잘못되면 ValueError
+def decode_meal_cursor(cursor: str) -> tuple[datetime, int]:
+    dt_str, _, meal_id = cursor.rpartition("_")
+    return datetime.fromisoformat(dt_str), int(meal_id)
+
+
+## (datetime, meal_id) 내림차순 키셋 페이지 조회, 다음 페이지가 있으면 다음 커서도 반환
+async def get_meal_page(
+    db: AsyncSession, user_id: int, filters: list, cursor: str | None, limit: int
+) -> tuple[list[Meal], str | None]:
+    query = (
+        select(Meal)
+        .options(selectinload(Meal.meal_foods).joinedload(MealFood.food))
+        .where(Meal.user_id == user_id, *filters)
+    )
+    if cursor:
+        cursor_dt, cursor_id = decode_meal_cursor(cursor)
+        query = query.where(
+            or_(
+                Meal.datetime < cursor_dt,
+                and_(Meal.datetime == cursor_dt, Meal.meal_id < cursor_id),
+            )
+        )
+    meals = list(await db.scalars(query.order_by(Meal.datetime.desc(), Meal.meal_id.desc()).limit(limit + 1)))
+    if len(meals) > limit:
+        meals = meals[:limit]
+        return meals, encode_meal_cursor(meals[-1])
+    return meals, None
+
+
+## 식사별 영양 성분 합계를 DB에서 한 번에 집계
+async def get_meal_totals(db: AsyncSession, meal_ids: list[int]) -> dict[int, dict]:
+    if not meal_ids:
+        return {}
+    rows = await db.execute(
+        select(
+            MealFood.meal_id,
+            func.coalesce(func.sum(MealFood.calories), 0),
+            func.coalesce(func.sum(MealFood.protein), 0),
+            func.coalesce(func.sum(MealFood.carbs), 0),
+            func.coalesce(func.sum(MealFood.fat), 0),
+        )
+        .where(MealFood.meal_id.in_(meal_ids))
+        .group_by(MealFood.meal_id)
+    )
+    return {
+        meal_id: {"calories": float(cal), "protein": float(pro), "carbs": float(carb), "fat": float(fat)}
+        for meal_id, cal, pro, carb, fat in rows
+    }
+
+
+## 요청된 food_id들을 IN (...) 한 번으로 조회
+def resolve_foods(db: Session, food_ids) -> dict[int, Food]:
+    food_ids = set(food_ids)
+    if not food_ids:
+        return {}
+    return {food.food_id: food for food in db.query(Food).filter(Food.food_id.in_(food_ids))}
+
+
+## 음식 1개 기준 영양 성분 x 수량
+def food_nutrients(food: Food, quantity: int) -> dict:
+    return {key: (getattr(food, f"{key}_per_unit") or 0) * quantity for key in NUTRIENTS}
+
+
+## meal_food 행(dict) 생성
+def build_meal_food_row(meal_id: int, food: Food, quantity: int) -> dict:
+    return {"meal_id": meal_id, "food_id": food.food_id, "quantity": quantity, **food_nutrients(food, quantity)}
+
+
+## meal_food 행들을 한 번의 INSERT로 저장
+def insert_meal_foods(db: Session, rows: list[dict]) -> None:
+    if rows:
+        db.execute(insert(MealFood), rows)
+
+
+## 식사의 음식 목록을 요청 내용으로 바꿈 (바뀐 행만 INSERT/UPDATE/DELETE)
+## 같은 음식이 여러 번 오면 수량을 합침, 변경 전/후 영양 합계를 반환
+def apply_meal_food_diff(db: Session, meal: Meal, quantities: dict[int, int], foods: dict[int, Food]) -> tuple[list, list]:
+    existing = db.query(MealFood).filter(MealFood.meal_id == meal.meal_id).all()
+    before = [{key: getattr(row, key) for key in NUTRIENTS} for row in existing]
+
+    kept = {}
+    to_delete = []
+    for row in existing:
+        if row.food_id in quantities and row.food_id not in kept:
+            kept[row.food_id] = row
+        else:
+            to_delete.append(row.id)
+
+    after = []
+    to_update = []
+    to_insert = []
+    for food_id, quantity in quantities.items():
+        row = kept.get(food_id)
+        if row is None:
+            new_row = build_meal_food_row(meal.meal_id, foods[food_id], quantity)
+            to_insert.append(new_row)
+            after.append(new_row)
+        elif row.quantity != quantity:
+            new_row = {"id": row.id, "quantity": quantity, **food_nutrients(foods[food_id], quantity)}
+            to_update.append(new_row)
+            after.append(new_row)
+        else:
+            after.append({key: getattr(row, key) for key in NUTRIENTS})
+
+    if to_delete:
+        db.execute(delete(MealFood).where(MealFood.id.in_(to_delete)).execution_options(synchronize_session=False))
+    if to_update:
+        ids = [row["id"] for row in to_update]
+        values = {
+            column: case({row["id"]: row[column] for row in to_update}, value=MealFood.id)
+            for column in ("quantity", *NUTRIENTS)
+        }
+        db.execute(update(MealFood).where(MealFood.id.in_(ids)).values(**values).execution_options(synchronize_session=False))
+    insert_meal_foods(db, to_insert)
+    return before, after
+
+
+## 이미 저장된 idempotency_key -> meal_id
+def find_meals_by_keys(db: Session, user_id: int, keys) -> dict[str, int]:
+    keys = list(keys)
+    if not keys:
+        return {}
+    rows = db.execute(
+        select(Meal.idempotency_key, Meal.meal_id)
+        .where(Meal.user_id == user_id, Meal.idempotency_key.in_(keys))
+    )
+    return dict(rows.all())
+
+
+## 식사 여러 개를 한 번의 INSERT로 저장한 뒤 idempotency_key로 meal_id를 다시 조회
+def insert_meals(db: Session, user_id: int, meals: list[dict]) -> dict[str, int]:
+    if not meals:
+        return {}
+    db.execute(insert(Meal), [{"user_id": user_id, **meal} for meal in meals])
+    return find_meals_by_keys(db, user_id, (meal["idempotency_key"] for meal in meals))
@@ -0,0 +1,154 @@
+from collections import defaultdict
+from contextvars import ContextVar
+import logging
+import os
+import threading
+import time
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+"""요청별 지연 시간, SQL 실행 횟수/시간, Gemini 호출 시간 측정 (Prometheus 텍스트 형식)"""
+
+logger = logging.getLogger(__name__)
+
+## METRICS_ENABLED=true일 때만 미들웨어 등록
+ENABLED = os.getenv("METRICS_ENABLED", "false").lower() == "true"
+## 요청 하나에서 SQL 실행이 이 횟수를 넘으면 N+1 의심으로 기록
+N_PLUS_ONE_THRESHOLD = int(os.getenv("METRICS_N_PLUS_ONE_THRESHOLD", "20"))
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RequestStats:
+    __slots__ = ("sql_count", "sql_seconds", "gemini_seconds")
+
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.gemini_seconds = 0.0
+
+
+## 현재 요청의 측정값 (스레드풀로 넘어가도 같은 객체를 공유)
+_current: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+_lock = threading.Lock()
+_latency = defaultdict(lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+_latency_sum = defaultdict(float)
+_counters = defaultdict(float)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.sql_count += 1
+        stats.sql_seconds += time.perf_counter() - started
+
+
+## SQLAlchemy 엔진에 실행 시간 측정 이벤트 등록 (비동기 엔진은 sync_engine을 넘김, 여러 번 호출해도 한 번만 등록)
+def instrument_engine(engine: Engine) -> None:
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+## Gemini 호출 시간 기록 (gemini_client에서 호출)
+def record_gemini(seconds: float) -> None:
+    stats = _current.get()
+    if stats is not None:
+        stats.gemini_seconds += seconds
+
+
+def _observe(method: str, route: str, status: int, seconds: float, stats: RequestStats) -> None:
+    key = (method, route)
+    with _lock:
+        buckets = _latency[key]
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                buckets[i] += 1
+                break
+        else:
+            buckets[-1] += 1
+        _latency_sum[key] += seconds
+        _counters[("requests", method, route, status)] += 1
+        _counters[("sql_statements", method, route)] += stats.sql_count
+        _counters[("sql_seconds", method, route)] += stats.sql_seconds
+        _counters[("gemini_seconds", method, route)] += stats.gemini_seconds
+        if stats.sql_count > N_PLUS_ONE_THRESHOLD:
+            _counters[("n_plus_one", method, route)] += 1
+
+
+## HTTP 미들웨어: 요청마다 측정값을 모아서 집계
+async def metrics_middleware(request: Request, call_next):
+    stats = RequestStats()
+    token = _current.set(stats)
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        seconds = time.perf_counter() - started
+        _current.reset(token)
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        _observe(request.method, route, status, seconds, stats)
+        if stats.sql_count > N_PLUS_ONE_THRESHOLD:
+            logger.warning(
+                "N+1 의심 요청: %s %s SQL %d회 (%.1fms)",
+                request.method, route, stats.sql_count, stats.sql_seconds * 1000,
+            )
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}"
+
+
+## Prometheus 텍스트 형식으로 출력, gauges는 {이름: 값} (캐시/풀 크기 등), counters는 {이름_total: 값} (적중/완료 횟수 등)
+def render(gauges: dict[str, float], counters_total: dict[str, float] | None = None) -> str:
+    lines = [
+        "# HELP app_request_duration_seconds 요청 처리 시간",
+        "# TYPE app_request_duration_seconds histogram",
+    ]
+    with _lock:
+        latency = {key: list(buckets) for key, buckets in _latency.items()}
+        latency_sum = dict(_latency_sum)
+        counters = dict(_counters)
+    for (method, route), buckets in sorted(latency.items()):
+        cumulative = 0
+        for bound, count in zip((*LATENCY_BUCKETS, "+Inf"), buckets):
+            cumulative += count
+            lines.append(f"app_request_duration_seconds_bucket{_labels(method=method, route=route, le=bound)} {cumulative}")
+        lines.append(f"app_request_duration_seconds_sum{_labels(method=method, route=route)} {latency_sum[(method, route)]}")
+        lines.append(f"app_request_duration_seconds_count{_labels(method=method, route=route)} {cumulative}")
+
+    names = {
+        "requests": ("app_requests_total", "counter"),
+        "sql_statements": ("app_sql_statements_total", "counter"),
+        "sql_seconds": ("app_sql_seconds_total", "counter"),
+        "gemini_seconds": ("app_gemini_seconds_total", "counter"),
+        "n_plus_one": ("app_n_plus_one_requests_total", "counter"),
+    }
+    for kind, (name, metric_type) in names.items():
+        lines.append(f"# TYPE {name} {metric_type}")
+        for key, value in sorted(counters.items(), key=str):
+            if key[0] != kind:
+                continue
+            if kind == "requests":
+                labels = _labels(method=key[1], route=key[2], status=key[3])
+            else:
+                labels = _labels(method=key[1], route=key[2])
+            lines.append(f"{name}{labels} {value}")
+
+    for name, value in sorted((counters_total or {}).items()):
+        lines.append(f"# TYPE {name} counter")
+        lines.append(f"{name} {value}")
+    for name, value in sorted(gauges.items()):
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {value}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,289 @@
+from contextlib import contextmanager
+import os
+
+from sqlalchemy import (
+    Column, DateTime, MetaData, String, Table, bindparam, delete, func, inspect, select, text, update
+)
+from sqlalchemy.engine import Connection, Engine
+
+from app import models
+from app.allergens import food_mask, to_mask
+from app.nutrition import NUTRIENTS, rebuild_daily_nutrition
+
+"""버전 관리되는 스키마 마이그레이션 (서버 시작 시 또는 python -m app.migrations로 적용)"""
+
+## 적용된 마이그레이션 버전 기록 테이블
+migration_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    migration_metadata,
+    Column("version", String(100), primary_key=True),
+    Column("applied_at", DateTime, server_default=func.now()),
+)
+
+
+## 다른 워커의 마이그레이션이 끝나기를 기다리는 최대 시간 (초)
+LOCK_TIMEOUT = int(os.getenv("DB_MIGRATION_LOCK_TIMEOUT", "300"))
+
+
+## 인덱스가 없을 때만 생성
+def _ensure_index(conn: Connection, index) -> None:
+    existing = {i["name"] for i in inspect(conn).get_indexes(index.table.name)}
+    if index.name not in existing:
+        index.create(conn)
+
+
+## 컬럼이 없을 때만 추가 (nullable이거나 server_default가 있는 컬럼만 사용)
+def _ensure_column(conn: Connection, column) -> None:
+    table = column.table
+    existing = {c["name"] for c in inspect(conn).get_columns(table.name)}
+    if column.name not in existing:
+        ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(dialect=conn.dialect)}"
+        if column.server_default is not None:
+            ddl += f" NOT NULL DEFAULT {column.server_default.arg}"
+        conn.execute(text(ddl))
+
+
+## 컬럼 타입을 모델 정의에 맞게 변경 (MySQL은 테이블당 ALTER 한 번, SQLite는 타입 변경 없이 소수 저장 가능)
+def _alter_column_types(conn: Connection, columns) -> None:
+    if conn.dialect.name != "mysql":
+        return
+    table = columns[0].table
+    clauses = [
+        f"MODIFY COLUMN {column.name} {column.type.compile(dialect=conn.dialect)} {'NULL' if column.nullable else 'NOT NULL'}"
+        for column in columns
+    ]
+    conn.execute(text(f"ALTER TABLE {table.name} {', '.join(clauses)}"))
+
+
+def _table_index(table, name: str):
+    return next(i for i in table.indexes if i.name == name)
+
+
+## 0000: 모델 기준 테이블 생성 (없는 테이블만 생성, 이전의 create_all 대신)
+def _base_schema(conn: Connection) -> None:
+    models.Base.metadata.create_all(conn)
+
+
+## 0001: 식사 조회용 복합 인덱스 및 meal_food 인덱스
+def _meal_indexes(conn: Connection) -> None:
+    meals = models.Meal.__table__
+    meal_food = models.MealFood.__table__
+    _ensure_index(conn, _table_index(meals, "ix_meals_user_id_datetime"))
+    _ensure_index(conn, _table_index(meal_food, "ix_meal_food_meal_id"))
+    _ensure_index(conn, _table_index(meal_food, "ix_meal_food_food_id"))
+
+
+## 0002: 일별 영양 집계 테이블 생성 및 기존 식사 기록으로 채우기
+def _daily_nutrition(conn: Connection) -> None:
+    models.DailyNutrition.__table__.create(conn, checkfirst=True)
+    rebuild_daily_nutrition(conn)
+
+
+## 쉼표로 구분된 알레르기 문자열들을 순서대로 중복 없이 합침
+def _merge_allergen_text(values) -> str | None:
+    items = []
+    for value in values:
+        for item in (value or "").split(","):
+            item = item.strip()
+            if item and item not in items:
+                items.append(item)
+    return ", ".join(items)[:500] or None
+
+
+## 이름이 같은 음식들을 food_id가 가장 작은 음식 하나로 합침
+## meal_food는 남는 음식을 가리키도록 변경 (식사 기록에 저장된 영양 성분은 그대로), 재고는 유저별로 수량을 합침
+## allergens는 모든 중복 음식의 항목을 합쳐서 알레르기 정보가 빠지지 않도록 함
+def _merge_duplicate_foods(conn: Connection) -> None:
+    foods = models.Food.__table__
+    meal_food = models.MealFood.__table__
+    inventory = models.UserFoodInventory.__table__
+    names = conn.execute(select(foods.c.name).group_by(foods.c.name).having(func.count() > 1)).scalars().all()
+    for name in names:
+        rows = conn.execute(
+            select(foods.c.food_id, foods.c.allergens).where(foods.c.name == name).order_by(foods.c.food_id)
+        ).all()
+        keep_id = rows[0].food_id
+        duplicate_ids = [row.food_id for row in rows[1:]]
+        conn.execute(
+            update(foods).where(foods.c.food_id == keep_id).values(allergens=_merge_allergen_text(row.allergens for row in rows))
+        )
+        conn.execute(update(meal_food).where(meal_food.c.food_id.in_(duplicate_ids)).values(food_id=keep_id))
+
+        ## 유저별로 남는 음식의 재고 행 (없으면 가장 먼저 생긴 행) 하나에 수량을 합치고 나머지 삭제
+        inventory_rows = conn.execute(
+            select(inventory.c.inventory_id, inventory.c.user_id, inventory.c.quantity)
+            .where(inventory.c.food_id.in_([keep_id, *duplicate_ids]))
+            .order_by(inventory.c.food_id != keep_id, inventory.c.inventory_id)
+        ).all()
+        by_user = {}
+        for row in inventory_rows:
+            by_user.setdefault(row.user_id, []).append(row)
+        for user_rows in by_user.values():
+            keep_row, *others = user_rows
+            if others:
+                conn.execute(delete(inventory).where(inventory.c.inventory_id.in_([row.inventory_id for row in others])))
+            conn.execute(
+                update(inventory).where(inventory.c.inventory_id == keep_row.inventory_id)
+                .values(food_id=keep_id, quantity=sum(row.quantity for row in user_rows))
+            )
+        conn.execute(delete(foods).where(foods.c.food_id.in_(duplicate_ids)))
+
+
+## 0003: 음식 이름 유니크 인덱스 (중복 이름이 있으면 하나로 합친 뒤 생성)
+def _food_name_unique(conn: Connection) -> None:
+    _merge_duplicate_foods(conn)
+    _ensure_index(conn, _table_index(models.Food.__table__, "uq_foods_name"))
+
+
+## 0004: 식사 일괄 저장용 idempotency_key 컬럼 및 (user_id, idempotency_key) 유니크 인덱스
+def _meal_idempotency_key(conn: Connection) -> None:
+    meals = models.Meal.__table__
+    _ensure_column(conn, meals.c.idempotency_key)
+    _ensure_index(conn, _table_index(meals, "uq_meals_user_id_idempotency_key"))
+
+
+## (pk, mask) 목록을 batch_size개씩 UPDATE
+def _write_masks(conn: Connection, pk_column, masks, batch_size: int = 1000) -> None:
+    rows = [{"b_pk": pk, "b_mask": mask} for pk, mask in masks]
+    stmt = (
+        update(pk_column.table)
+        .where(pk_column == bindparam("b_pk"))
+        .values(allergen_mask=bindparam("b_mask"))
+    )
+    for i in range(0, len(rows), batch_size):
+        conn.execute(stmt, rows[i:i + batch_size])
+
+
+## 0005: 음식/유저 알레르기 비트마스크 컬럼 추가 및 기존 문자열로 채우기
+def _allergen_masks(conn: Connection) -> None:
+    foods = models.Food.__table__
+    users = models.User.__table__
+    _ensure_column(conn, foods.c.allergen_mask)
+    _ensure_column(conn, users.c.allergen_mask)
+
+    ## 0인 값은 기본값과 같으므로 건너뜀
+    food_rows = conn.execute(select(foods.c.food_id, foods.c.name, foods.c.allergens))
+    food_masks = ((food_id, food_mask(name, allergens)) for food_id, name, allergens in food_rows)
+    _write_masks(conn, foods.c.food_id, [(food_id, mask) for food_id, mask in food_masks if mask])
+    user_rows = conn.execute(select(users.c.user_id, users.c.allergies).where(users.c.allergies.is_not(None)))
+    user_masks = ((user_id, to_mask(allergies)) for user_id, allergies in user_rows)
+    _write_masks(conn, users.c.user_id, [(user_id, mask) for user_id, mask in user_masks if mask])
+
+
+## 0006: 영양 성분 컬럼을 정수에서 소수점 2자리 고정소수점으로 변경 (기존 값은 그대로 유지)
+def _fixed_point_nutrients(conn: Connection) -> None:
+    foods = models.Food.__table__
+    meal_food = models.MealFood.__table__
+    daily = models.DailyNutrition.__table__
+    _alter_column_types(conn, [foods.c[f"{key}_per_unit"] for key in NUTRIENTS])
+    _alter_column_types(conn, [meal_food.c[key] for key in NUTRIENTS])
+    _alter_column_types(conn, [daily.c[key] for key in NUTRIENTS])
+
+
+## 0007: 재고 (user_id, food_id) 유니크 인덱스, 중복 행은 가장 먼저 생긴 행에 수량을 합친 뒤 삭제
+def _inventory_unique(conn: Connection) -> None:
+    inventory = models.UserFoodInventory.__table__
+    groups = conn.execute(
+        select(inventory.c.user_id, inventory.c.food_id, func.min(inventory.c.inventory_id), func.sum(inventory.c.quantity))
+        .group_by(inventory.c.user_id, inventory.c.food_id)
+        .having(func.count() > 1)
+    ).all()
+    if groups:
+        conn.execute(
+            update(inventory).where(inventory.c.inventory_id == bindparam("b_id")).values(quantity=bindparam("b_quantity")),
+            [{"b_id": keep_id, "b_quantity": quantity} for _, _, keep_id, quantity in groups],
+        )
+        for user_id, food_id, keep_id, _ in groups:
+            conn.execute(
+                delete(inventory).where(
+                    inventory.c.user_id == user_id, inventory.c.food_id == food_id, inventory.c.inventory_id != keep_id
+                )
+            )
+    _ensure_index(conn, _table_index(inventory, "uq_user_food_inventory_user_id_food_id"))
+
+
+## 0008: 음식 이름으로 추정한 알레르기를 단어 기준으로 다시 계산 (예: "밀감"의 밀 비트 제거, "두부"에 대두 비트 추가)
+def _food_allergen_masks_by_keyword(conn: Connection) -> None:
+    foods = models.Food.__table__
+    rows = conn.execute(select(foods.c.food_id, foods.c.name, foods.c.allergens, foods.c.allergen_mask))
+    masks = ((food_id, food_mask(name, allergens), old) for food_id, name, allergens, old in rows)
+    _write_masks(conn, foods.c.food_id, [(food_id, mask) for food_id, mask, old in masks if mask != old])
+
+
+## 0009: 음식 목록 버전 테이블 (행이 하나도 없으면 버전 1로 추가)
+def _food_catalog_version(conn: Connection) -> None:
+    table = models.FoodCatalogVersion.__table__
+    table.create(conn, checkfirst=True)
+    if conn.execute(select(table.c.id)).first() is None:
+        conn.execute(table.insert().values(id=1, version=1))
+
+
+## (버전, 적용 함수) 목록, 순서대로 적용
+MIGRATIONS = [
+    ("0000_base_schema", _base_schema),
+    ("0001_meal_indexes", _meal_indexes),
+    ("0002_daily_nutrition", _daily_nutrition),
+    ("0003_food_name_unique", _food_name_unique),
+    ("0004_meal_idempotency_key", _meal_idempotency_key),
+    ("0005_allergen_masks", _allergen_masks),
+    ("0006_fixed_point_nutrients", _fixed_point_nutrients),
+    ("0007_inventory_unique", _inventory_unique),
+    ("0008_food_allergen_masks_by_keyword", _food_allergen_masks_by_keyword),
+    ("0009_food_catalog_version", _food_catalog_version),
+]
+
+
+## 여러 워커가 동시에 시작해도 한 곳에서만 마이그레이션하도록 잠금 (MySQL: GET_LOCK, 잠금을 쥔 커넥션을 끝까지 유지)
+## SQLite(테스트/벤치마크용, 프로세스 하나)는 잠금 없음
+@contextmanager
+def _migration_lock(engine: Engine):
+    if engine.dialect.name != "mysql":
+        yield
+        return
+    with engine.connect() as lock_conn:
+        acquired = lock_conn.scalar(text("SELECT GET_LOCK('schema_migrations', :timeout)"), {"timeout": LOCK_TIMEOUT})
+        if acquired != 1:
+            raise RuntimeError(f"마이그레이션 잠금을 {LOCK_TIMEOUT}초 안에 얻지 못했습니다.")
+        try:
+            yield
+        finally:
+            lock_conn.execute(text("SELECT RELEASE_LOCK('schema_migrations')"))
+
+
+## 아직 적용되지 않은 마이그레이션을 순서대로 적용 (잠금을 얻은 뒤 적용 목록을 읽으므로 먼저 끝난 워커가 적용한 버전은 건너뜀)
+def upgrade(engine: Engine) -> list[str]:
+    with _migration_lock(engine):
+        migration_metadata.create_all(engine)
+        with engine.connect() as conn:
+            applied = set(conn.execute(select(schema_migrations.c.version)).scalars())
+        newly_applied = []
+        for version, migrate in MIGRATIONS:
+            if version in applied:
+                continue
+            with engine.begin() as conn:
+                migrate(conn)
+                conn.execute(schema_migrations.insert().values(version=version))
+            newly_applied.append(version)
+        if newly_applied:
+            _bump_food_catalog_version(engine)
+    return newly_applied
+
+
+## 마이그레이션이 음식 데이터를 바꿨을 수 있으므로 음식 목록 버전을 올림 (예전 ETag로 304가 나가지 않도록)
+def _bump_food_catalog_version(engine: Engine) -> None:
+    table = models.FoodCatalogVersion.__table__
+    with engine.begin() as conn:
+        conn.execute(update(table).where(table.c.id == 1).values(version=table.c.version + 1))
+
+
+## CLI: python -m app.migrations (DB_MIGRATE_ON_STARTUP=false로 배포할 때 먼저 실행)
+def main():
+    from app.database import get_engine
+
+    applied = upgrade(get_engine())
+    print(f"적용된 마이그레이션: {', '.join(applied)}" if applied else "적용할 마이그레이션이 없습니다")
+
+
+if __name__ == "__main__":
+    main()
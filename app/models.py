@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Enum, ForeignKey, Date, DateTime
+from sqlalchemy import Column, Integer, BigInteger, Numeric, String, Enum, ForeignKey, Date, DateTime, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 from datetime import datetime, timezone
@@ -12,22 +12,30 @@ class Meal(Base):
     user_id = Column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"))
     datetime = Column(DateTime, default=datetime.now(timezone.utc))
     meal_type = Column(Enum("아침", "점심", "저녁", name="meal_type_enum"), nullable=False)
+    ## 오프라인 동기화 시 중복 저장 방지용 클라이언트 키
+    idempotency_key = Column(String(64), nullable=True)
 
     user = relationship("User", back_populates="meals")
     meal_foods = relationship("MealFood", back_populates="meal", cascade="all, delete-orphan")
 
+    ## 유저별 기간 조회용 복합 인덱스
+    __table_args__ = (
+        Index("ix_meals_user_id_datetime", "user_id", "datetime"),
+        Index("uq_meals_user_id_idempotency_key", "user_id", "idempotency_key", unique=True),
+    )
+
 
 class MealFood(Base):
     __tablename__ = "meal_food"
 
     id = Column(Integer, primary_key=True)
-    meal_id = Column(Integer, ForeignKey("meals.meal_id", ondelete="CASCADE"))
-    food_id = Column(Integer, ForeignKey("foods.food_id", ondelete="CASCADE"))
+    meal_id = Column(Integer, ForeignKey("meals.meal_id", ondelete="CASCADE"), index=True)
+    food_id = Column(Integer, ForeignKey("foods.food_id", ondelete="CASCADE"), index=True)
     quantity = Column(Integer, nullable=False)
-    calories = Column(Integer)
-    protein = Column(Integer)
-    carbs = Column(Integer)
-    fat = Column(Integer)
+    calories = Column(Numeric(10, 2))
+    protein = Column(Numeric(10, 2))
+    carbs = Column(Numeric(10, 2))
+    fat = Column(Numeric(10, 2))
 
     meal = relationship("Meal", back_populates="meal_foods")
     food = relationship("Food")
@@ -49,6 +57,8 @@ class User(Base):
     age = Column(Integer, nullable=False)
 
     allergies = Column(String(255), nullable=True)
+    ## allergies를 app.allergens 기준 비트마스크로 변환한 값
+    allergen_mask = Column(BigInteger, default=0, server_default="0", nullable=False)
 
     goal = relationship(
         "Goal", back_populates="user", uselist=False, cascade="all, delete-orphan"
@@ -81,14 +91,20 @@ class Food(Base):
     name = Column(String(100), nullable=False)
 
     unit = Column(Integer, nullable=True)
-    calories_per_unit = Column(Integer, nullable=True)
-    protein_per_unit = Column(Integer, nullable=True)
-    carbs_per_unit = Column(Integer, nullable=True)
-    fat_per_unit = Column(Integer, nullable=True)
+    ## 영양 성분은 소수점 2자리 고정소수점 (0.3g 같은 값이 잘리지 않도록)
+    calories_per_unit = Column(Numeric(10, 2), nullable=True)
+    protein_per_unit = Column(Numeric(10, 2), nullable=True)
+    carbs_per_unit = Column(Numeric(10, 2), nullable=True)
+    fat_per_unit = Column(Numeric(10, 2), nullable=True)
     allergens = Column(String(500), nullable=True)
+    ## allergens(+이름)를 app.allergens 기준 비트마스크로 변환한 값
+    allergen_mask = Column(BigInteger, default=0, server_default="0", nullable=False)
 
     inventories = relationship("UserFoodInventory", back_populates="food")
 
+    ## 일괄 등록 시 이름 기준 upsert용 유니크 인덱스
+    __table_args__ = (Index("uq_foods_name", "name", unique=True),)
+
 
 
 ## UserFoodInventory 테이블
@@ -106,3 +122,29 @@ class UserFoodInventory(Base):
 
     user = relationship("User", back_populates="inventory")
     food = relationship("Food", back_populates="inventories")
+
+    ## 유저당 음식 1행 (재고 추가 시 upsert 키)
+    __table_args__ = (Index("uq_user_food_inventory_user_id_food_id", "user_id", "food_id", unique=True),)
+
+
+## DailyNutrition 테이블 (유저별 일일 섭취 집계, 식사 기록 시 함께 갱신)
+class DailyNutrition(Base):
+    __tablename__ = "daily_nutrition"
+
+    user_id = Column(
+        Integer, ForeignKey("users.user_id", ondelete="CASCADE"), primary_key=True
+    )
+    date = Column(Date, primary_key=True)
+    calories = Column(Numeric(12, 2), default=0, nullable=False)
+    protein = Column(Numeric(12, 2), default=0, nullable=False)
+    carbs = Column(Numeric(12, 2), default=0, nullable=False)
+    fat = Column(Numeric(12, 2), default=0, nullable=False)
+
+
+## FoodCatalogVersion 테이블 (한 행, 음식이 추가/수정될 때마다 version 1 증가)
+## 워커마다 따로 있는 음식 검색 인덱스/목록 캐시가 다른 워커나 CLI 일괄 등록의 변경을 알아채는 기준
+class FoodCatalogVersion(Base):
+    __tablename__ = "food_catalog_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, default=0, nullable=False)
@@ -0,0 +1,173 @@
+import argparse
+from collections import defaultdict
+from datetime import date, datetime, time
+
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.models import DailyNutrition, Food, Meal, MealFood
+from app.sql_utils import build_upsert, local_date_bucket
+from app.timeutil import get_zone, local_date_range, to_local_date
+
+"""일별 영양 섭취 집계(daily_nutrition) 및 meal_food 영양 스냅샷 관리 함수"""
+
+NUTRIENTS = ("calories", "protein", "carbs", "fat")
+
+
+## meal_food 행(dict 또는 ORM 객체)들의 영양 성분 합계
+def sum_nutrients(rows) -> dict:
+    total = dict.fromkeys(NUTRIENTS, 0)
+    for row in rows:
+        for key in NUTRIENTS:
+            value = row[key] if isinstance(row, dict) else getattr(row, key)
+            total[key] += value or 0
+    return total
+
+
+## 두 합계의 차이 (after - before)
+def diff_nutrients(after: dict, before: dict) -> dict:
+    return {key: after[key] - before[key] for key in NUTRIENTS}
+
+
+## 식사가 속한 날짜의 집계에 변화량을 더함 (호출한 쪽의 트랜잭션 안에서 실행)
+def apply_daily_delta(db: Session, user_id: int, meal_datetime: datetime, delta: dict) -> None:
+    apply_daily_deltas(db, user_id, [(meal_datetime, delta)])
+
+
+## 여러 식사의 변화량을 날짜별로 합쳐 한 번의 upsert로 반영
+def apply_daily_deltas(db: Session, user_id: int, deltas) -> None:
+    by_day = defaultdict(lambda: dict.fromkeys(NUTRIENTS, 0))
+    for meal_datetime, delta in deltas:
+        day_total = by_day[to_local_date(meal_datetime)]
+        for key in NUTRIENTS:
+            day_total[key] += delta[key]
+    rows = [{"user_id": user_id, "date": day, **delta} for day, delta in by_day.items() if any(delta.values())]
+    if not rows:
+        return
+    table = DailyNutrition.__table__
+    stmt = build_upsert(db.get_bind().dialect.name, table, ["user_id", "date"], increment=NUTRIENTS)
+    db.execute(stmt, rows)
+
+
+## 기간 [first, last]의 일별 집계 조회
+def get_daily_nutrition(db: Session, user_id: int, first: date, last: date) -> list[DailyNutrition]:
+    return (
+        db.query(DailyNutrition)
+        .filter(
+            DailyNutrition.user_id == user_id,
+            DailyNutrition.date >= first,
+            DailyNutrition.date <= last,
+        )
+        .order_by(DailyNutrition.date)
+        .all()
+    )
+
+
+## 기간 [first, last]의 영양 성분 합계를 일/주/월(+끼니) 단위로 DB에서 집계해 컬럼별 배열로 반환
+## 현지 시간 변환은 시작일의 UTC 오프셋을 사용 (서머타임이 있는 시간대는 전환일 전후 몇 시간이 옆 구간에 들어갈 수 있음)
+def get_nutrition_summary(
+    db: Session, user_id: int, first: date, last: date, granularity: str = "day",
+    by_meal_type: bool = False, tz: str | None = None,
+) -> dict:
+    start, end = local_date_range(first, last, tz)
+    offset = datetime.combine(first, time.min, tzinfo=get_zone(tz)).utcoffset()
+    bucket = local_date_bucket(db.get_bind().dialect.name, Meal.datetime, int(offset.total_seconds()), granularity)
+    keys = [bucket.label("bucket")]
+    if by_meal_type:
+        keys.append(Meal.meal_type)
+    rows = db.execute(
+        select(*keys, *(func.coalesce(func.sum(getattr(MealFood, key)), 0) for key in NUTRIENTS))
+        .join(MealFood, MealFood.meal_id == Meal.meal_id)
+        .where(Meal.user_id == user_id, Meal.datetime >= start, Meal.datetime < end)
+        .group_by(*keys)
+        .order_by(*keys)
+    ).all()
+
+    ## DB에 따라 date 또는 문자열로 오므로 "YYYY-MM-DD" 문자열로 통일
+    summary = {"granularity": granularity, "bucket": [str(row[0])[:10] for row in rows]}
+    if by_meal_type:
+        summary["meal_type"] = [row[1] for row in rows]
+    for i, key in enumerate(NUTRIENTS, start=len(keys)):
+        summary[key] = [float(row[i]) for row in rows]
+    return summary
+
+
+## meal_food 원본으로부터 일별 집계를 다시 계산 (user_ids가 없으면 전체)
+def rebuild_daily_nutrition(conn: Connection, user_ids=None, batch_size: int = 1000) -> None:
+    table = DailyNutrition.__table__
+    query = (
+        select(
+            Meal.user_id,
+            Meal.datetime,
+            *(func.coalesce(func.sum(getattr(MealFood, key)), 0) for key in NUTRIENTS),
+        )
+        .join(MealFood, MealFood.meal_id == Meal.meal_id)
+        .group_by(Meal.meal_id, Meal.user_id, Meal.datetime)
+    )
+    clear = delete(table)
+    if user_ids is not None:
+        query = query.where(Meal.user_id.in_(user_ids))
+        clear = clear.where(table.c.user_id.in_(user_ids))
+
+    totals = defaultdict(lambda: dict.fromkeys(NUTRIENTS, 0))
+    for user_id, meal_datetime, *values in conn.execute(query.execution_options(yield_per=batch_size)):
+        day_total = totals[(user_id, to_local_date(meal_datetime))]
+        for key, value in zip(NUTRIENTS, values):
+            day_total[key] += value
+
+    conn.execute(clear)
+    rows = [{"user_id": user_id, "date": day, **values} for (user_id, day), values in totals.items()]
+    for i in range(0, len(rows), batch_size):
+        conn.execute(table.insert(), rows[i:i + batch_size])
+
+
+## foods의 현재 영양 정보로 meal_food 스냅샷을 다시 계산 (food_ids가 없으면 전체)
+## 값이 달라진 행만 한 번의 UPDATE ... JOIN으로 갱신하고, 해당 유저의 일별 집계도 다시 계산
+def recompute_meal_foods(conn: Connection, food_ids=None, batch_size: int = 1000) -> int:
+    meal_food = MealFood.__table__
+    foods = Food.__table__
+    expected = {key: func.coalesce(foods.c[f"{key}_per_unit"], 0) * meal_food.c.quantity for key in NUTRIENTS}
+    conditions = [
+        meal_food.c.food_id == foods.c.food_id,
+        or_(*(or_(meal_food.c[key].is_(None), meal_food.c[key] != value) for key, value in expected.items())),
+    ]
+    if food_ids is not None:
+        conditions.append(meal_food.c.food_id.in_(food_ids))
+
+    ## 갱신 후에는 조건에 걸리지 않으므로 영향받는 유저를 먼저 조회
+    user_ids = conn.execute(
+        select(Meal.user_id).distinct()
+        .join(meal_food, meal_food.c.meal_id == Meal.meal_id)
+        .join(foods, foods.c.food_id == meal_food.c.food_id)
+        .where(*conditions[1:])
+    ).scalars().all()
+    if not user_ids:
+        return 0
+    updated = conn.execute(update(meal_food).where(*conditions).values(**expected)).rowcount
+    for i in range(0, len(user_ids), batch_size):
+        rebuild_daily_nutrition(conn, user_ids[i:i + batch_size], batch_size)
+    return updated
+
+
+## CLI: python -m app.nutrition recompute --food-id 12 --food-id 40
+##      python -m app.nutrition rebuild-daily
+def main():
+    parser = argparse.ArgumentParser(description="영양 성분 스냅샷/일별 집계를 다시 계산합니다.")
+    parser.add_argument("command", choices=["recompute", "rebuild-daily"])
+    parser.add_argument("--food-id", type=int, action="append", help="recompute 대상 음식 (없으면 전체)")
+    args = parser.parse_args()
+
+    from app.database import get_engine
+
+    with get_engine().begin() as conn:
+        if args.command == "recompute":
+            updated = recompute_meal_foods(conn, args.food_id)
+            print(f"meal_food {updated}개 갱신 완료")
+        else:
+            rebuild_daily_nutrition(conn)
+            print("일별 집계 재계산 완료")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import hashlib
+import json
+import os
+
+from app.cache import TTLCache
+from app.diet_service import DietInputs
+
+"""AI 식단 추천 결과 캐시 (정규화한 입력값의 해시를 키로 사용)"""
+
+## 오늘 섭취 칼로리를 이 단위로 묶어서 키를 만듦 (조금 먹은 것으로는 새로 추천하지 않음)
+INTAKE_BUCKET = int(os.getenv("RECOMMENDATION_INTAKE_BUCKET", "100"))
+
+_cache = TTLCache(
+    maxsize=int(os.getenv("RECOMMENDATION_CACHE_SIZE", "5000")),
+    ttl=float(os.getenv("RECOMMENDATION_CACHE_TTL", "3600")),
+    max_bytes=int(os.getenv("RECOMMENDATION_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+    sizeof=lambda text: len(text.encode()),
+)
+
+
+## 목표 칼로리, 섭취량 구간, 정렬한 재고 목록, 로컬 플래너가 정한 식단(끼니별 음식/개수)의 해시
+## 설명 문장은 식단을 그대로 풀어 쓰므로 식단이 다르면 같은 키가 되지 않도록 함
+def fingerprint(inputs: DietInputs, plan: dict) -> str:
+    normalized = {
+        "goal": inputs.goal_calories,
+        "intake_bucket": inputs.eaten_calories // INTAKE_BUCKET,
+        "items": sorted(inputs.items),
+        "plan": [
+            [meal["meal_type"], [[item["food_id"], item["name"], item["quantity"]] for item in meal["items"]]]
+            for meal in plan["meals"]
+        ],
+    }
+    return hashlib.sha256(json.dumps(normalized, ensure_ascii=False).encode()).hexdigest()
+
+
+def get(key: str) -> str | None:
+    return _cache.get(key)
+
+
+## 재고/식사/프로필이 바뀌면 입력값이 달라져 다른 키가 되므로 따로 지우지 않음 (예전 키는 TTL/LRU로 제거)
+def put(key: str, recommendation: str) -> None:
+    _cache.set(key, recommendation)
+
+
+def stats() -> dict:
+    return _cache.stats()
@@ -0,0 +1,23 @@
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+
+"""응답 직렬화 함수 (검증은 한 번만, JSON 인코딩은 pydantic-core/orjson 사용)"""
+
+## response_model 타입별 TypeAdapter (스키마 생성 비용이 커서 한 번만 만듦)
+_adapters = {}
+
+
+def _adapter(model) -> TypeAdapter:
+    adapter = _adapters.get(model)
+    if adapter is None:
+        adapter = _adapters.setdefault(model, TypeAdapter(model))
+    return adapter
+
+
+## response_model과 같은 타입으로 한 번만 검증한 뒤 바로 JSON bytes로 변환
+## Response를 반환하면 FastAPI가 response_model로 다시 검증하지 않음 (OpenAPI 문서에는 그대로 사용)
+## ORM 객체도 from_attributes로 바로 읽음
+def model_response(model, data, headers: dict | None = None) -> Response:
+    adapter = _adapter(model)
+    body = adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+    return Response(content=body, media_type="application/json", headers=headers)
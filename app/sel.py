@@ -146,3 +146,35 @@ if st.button("서버에서 식사 기록 불러오기"):
         st.write(f"🥑 지방: {total['fat']}g")
     else:
         st.error(f"❌ 식사 기록 불러오기 실패: {res.status_code}")
+
+# ✅ 기간별 섭취 추이 (서버에서 집계된 값만 받아서 그래프로 표시)
+st.markdown("---")
+st.subheader("기간별 섭취 추이")
+granularity_label = st.selectbox("집계 단위", ["일별", "주별", "월별"])
+granularity = {"일별": "day", "주별": "week", "월별": "month"}[granularity_label]
+trend_to = st.date_input("종료일", datetime.date.today())
+trend_from = st.date_input("시작일", trend_to - datetime.timedelta(days=365))
+
+if st.button("섭취 추이 불러오기"):
+    res = requests.get(
+        "http://localhost:8000/nutrition/summary",
+        headers={"Authorization": f"Bearer {token}"},
+        params={"from": trend_from.isoformat(), "to": trend_to.isoformat(), "granularity": granularity}
+    )
+    if res.status_code == 200:
+        summary = res.json()
+        fig, ax = plt.subplots()
+        ax.plot(summary["bucket"], summary["calories"], marker="o")
+        ax.set_ylabel("열량 (kcal)")
+        ax.tick_params(axis="x", rotation=45)
+        st.pyplot(fig)
+
+        fig, ax = plt.subplots()
+        ax.plot(summary["bucket"], summary["carbs"], label="탄수화물")
+        ax.plot(summary["bucket"], summary["protein"], label="단백질")
+        ax.plot(summary["bucket"], summary["fat"], label="지방")
+        ax.legend()
+        ax.tick_params(axis="x", rotation=45)
+        st.pyplot(fig)
+    else:
+        st.error(f"❌ 섭취 추이 불러오기 실패: {res.status_code}")
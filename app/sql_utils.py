@@ -0,0 +1,54 @@
+from sqlalchemy import Table, func, text
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+"""DB 종류별 SQL 구문 생성 함수"""
+
+
+## 키가 겹치면 increment 컬럼은 더하고 replace 컬럼은 덮어쓰는 INSERT 구문 생성
+## (MySQL: ON DUPLICATE KEY UPDATE, SQLite: ON CONFLICT DO UPDATE)
+def build_upsert(dialect_name: str, table: Table, key_columns: list[str], increment=(), replace=()):
+    if dialect_name == "mysql":
+        stmt = mysql_insert(table)
+        new = stmt.inserted
+    elif dialect_name == "sqlite":
+        stmt = sqlite_insert(table)
+        new = stmt.excluded
+    else:
+        raise NotImplementedError(f"upsert를 지원하지 않는 DB입니다: {dialect_name}")
+    values = {col: table.c[col] + new[col] for col in increment}
+    values.update({col: new[col] for col in replace})
+    if dialect_name == "mysql":
+        return stmt.on_duplicate_key_update(values)
+    return stmt.on_conflict_do_update(index_elements=key_columns, set_=values)
+
+
+## 키가 겹치는 행은 건너뛰는 INSERT 구문 생성
+## (MySQL: ON DUPLICATE KEY UPDATE로 키 컬럼을 그대로 둠 (IGNORE는 다른 오류까지 무시하므로 사용 안 함), SQLite: ON CONFLICT DO NOTHING)
+def build_insert_ignore(dialect_name: str, table: Table, key_columns: list[str]):
+    if dialect_name == "mysql":
+        stmt = mysql_insert(table)
+        return stmt.on_duplicate_key_update({key_columns[0]: table.c[key_columns[0]]})
+    if dialect_name == "sqlite":
+        return sqlite_insert(table).on_conflict_do_nothing(index_elements=key_columns)
+    raise NotImplementedError(f"upsert를 지원하지 않는 DB입니다: {dialect_name}")
+
+
+## UTC로 저장된 datetime 컬럼을 현지 날짜 기준 일/주(월요일 시작)/월 구간의 첫날로 변환하는 식
+## (MySQL: DATE/SUBDATE/DATE_FORMAT, SQLite: date() 수식어)
+def local_date_bucket(dialect_name: str, column, offset_seconds: int, granularity: str):
+    if dialect_name == "mysql":
+        day = func.date(func.timestampadd(text("SECOND"), offset_seconds, column))
+        if granularity == "week":
+            return func.subdate(day, func.weekday(day))
+        if granularity == "month":
+            return func.date_format(day, "%Y-%m-01")
+        return day
+    if dialect_name == "sqlite":
+        day = func.date(column, f"{offset_seconds:+d} seconds")
+        if granularity == "week":
+            return func.date(day, "-6 days", "weekday 1")
+        if granularity == "month":
+            return func.date(day, "start of month")
+        return day
+    raise NotImplementedError(f"날짜 구간 집계를 지원하지 않는 DB입니다: {dialect_name}")
@@ -0,0 +1,41 @@
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import os
+
+"""시간대 변환 관련 함수 (DB에는 UTC 기준 naive datetime으로 저장)"""
+
+## 요청에 시간대가 없을 때 사용할 기본 시간대
+DEFAULT_TZ = os.getenv("APP_TIMEZONE", "Asia/Seoul")
+
+
+## 시간대 이름을 ZoneInfo로 변환, 알 수 없는 이름이면 ValueError ("Asia"처럼 디렉토리이거나 너무 긴 이름의 OSError 포함)
+def get_zone(tz: str | None = None) -> ZoneInfo:
+    try:
+        return ZoneInfo(tz or DEFAULT_TZ)
+    except (ZoneInfoNotFoundError, ValueError, OSError):
+        raise ValueError(f"알 수 없는 시간대입니다: {tz}")
+
+
+## 현지 날짜 하루를 UTC 기준 반열린 구간 [start, end)로 변환
+def local_day_range(day: date, tz: str | None = None) -> tuple[datetime, datetime]:
+    return local_date_range(day, day, tz)
+
+
+## 현지 날짜 구간 [first, last]를 UTC 기준 반열린 구간 [start, end)로 변환 (9999-12-31처럼 범위를 벗어나면 ValueError)
+def local_date_range(first: date, last: date, tz: str | None = None) -> tuple[datetime, datetime]:
+    zone = get_zone(tz)
+    try:
+        start = datetime.combine(first, time.min, tzinfo=zone)
+        end = datetime.combine(last + timedelta(days=1), time.min, tzinfo=zone)
+        return _to_utc_naive(start), _to_utc_naive(end)
+    except OverflowError:
+        raise ValueError(f"조회할 수 없는 날짜 범위입니다: {first} ~ {last}")
+
+
+## DB에 저장된 UTC naive datetime을 현지 날짜로 변환
+def to_local_date(dt: datetime, tz: str | None = None) -> date:
+    return dt.replace(tzinfo=timezone.utc).astimezone(get_zone(tz)).date()
+
+
+def _to_utc_naive(dt: datetime) -> datetime:
+    return dt.astimezone(timezone.utc).replace(tzinfo=None)
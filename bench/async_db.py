@@ -0,0 +1,100 @@
+import argparse
+import asyncio
+import json
+
+from bench.db import use_database
+
+"""동기/비동기 DB 처리량 비교: 같은 재고 조회 쿼리를
+sync def + Session (스레드 풀), async def + AsyncSession, async def + Session (이벤트 루프를 막는 예전 방식)으로 실행
+
+python -m bench.async_db --users 50 --inventory 30 --requests 2000 --concurrency 50
+python -m bench.async_db --modes async_blocking --concurrency 10
+
+async_blocking은 동시 요청이 풀 크기(DB_POOL_SIZE + DB_MAX_OVERFLOW)를 넘으면 커넥션을 기다리는 동안
+이벤트 루프 전체가 멈춰서 반납도 못 하므로 풀 타임아웃(30초)까지 걸림, 그래서 기본 모드에서는 제외
+"""
+
+MODES = ("sync", "async")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="동기/비동기 DB 처리량 비교")
+    parser.add_argument("--database-url", help="기본값: 임시 SQLite 파일 (로컬 MySQL 권장)")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--foods", type=int, default=1000)
+    parser.add_argument("--inventory", type=int, default=30, help="유저당 재고 수")
+    parser.add_argument("--requests", type=int, default=2000, help="모드당 요청 수")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="결과 JSON 파일 경로")
+    return parser.parse_args()
+
+
+## 모드별 엔드포인트만 있는 벤치마크 전용 app (의존성/조회 함수는 서비스와 같은 것을 사용)
+def build_app():
+    from fastapi import Depends, FastAPI
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import Session
+
+    from app.dependencies import get_async_db, get_db
+    from app.inventory_repository import get_inventory_with_food, get_inventory_with_food_async
+
+    app = FastAPI()
+
+    @app.get("/sync")
+    def sync_inventory(user_id: int, db: Session = Depends(get_db)):
+        return len(get_inventory_with_food(db, user_id))
+
+    @app.get("/async")
+    async def async_inventory(user_id: int, db: AsyncSession = Depends(get_async_db)):
+        return len(await get_inventory_with_food_async(db, user_id))
+
+    @app.get("/async_blocking")
+    async def async_blocking_inventory(user_id: int, db: Session = Depends(get_db)):
+        return len(get_inventory_with_food(db, user_id))
+
+    return app
+
+
+async def run(args) -> dict:
+    import httpx
+
+    from app import auth, migrations
+    from app.database import dispose_engines, get_async_engine, get_engine
+    from bench import seed
+    from bench.run import measure
+
+    engine = get_engine()
+    get_async_engine()
+    migrations.upgrade(engine)
+    seed.seed(engine, auth.get_password_hash(seed.PASSWORD), args.users, args.foods, 0, args.inventory, args.seed)
+
+    results = {}
+    transport = httpx.ASGITransport(app=build_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for mode in args.modes.split(","):
+            def request(c, i, mode=mode):
+                return c.get(f"/{mode}", params={"user_id": i % args.users + 1})
+            await measure(client, request, min(args.concurrency, args.requests), args.concurrency)
+            results[mode] = await measure(client, request, args.requests, args.concurrency)
+            print(f"{mode:>15}: {results[mode]['rps']:>8} req/s  p50 {results[mode]['p50_ms']}ms  "
+                  f"p95 {results[mode]['p95_ms']}ms  p99 {results[mode]['p99_ms']}ms  errors {results[mode]['errors']}")
+    await dispose_engines()
+    return results
+
+
+def main():
+    args = parse_args()
+    tmpdir = use_database(args.database_url)
+    results = asyncio.run(run(args))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"config": {k: v for k, v in vars(args).items() if k not in ("out", "database_url")},
+                       "results": results}, f, ensure_ascii=False, indent=2)
+    if tmpdir:
+        tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
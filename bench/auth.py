@@ -0,0 +1,90 @@
+import argparse
+import json
+import random
+import statistics
+import time
+
+from bench.db import use_database
+
+"""요청당 인증 비용 비교: JWT claims만 (get_current_user_id), 캐시된 유저 정보 (get_current_principal 적중/미스),
+매 요청 DB 조회 (get_current_user)
+
+python -m bench.auth --users 1000 --calls 20000
+"""
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="인증 의존성 비용 비교")
+    parser.add_argument("--database-url", help="기본값: 임시 SQLite 파일 (로컬 MySQL 권장)")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--calls", type=int, default=20000, help="방식당 호출 수")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="결과 JSON 파일 경로")
+    return parser.parse_args()
+
+
+## 요청마다 세션을 새로 여는 것까지 포함해서 측정 (get_db와 같은 조건)
+def timed_calls(session_factory, tokens: list[str], resolve) -> dict:
+    latencies = []
+    for token in tokens:
+        started = time.perf_counter()
+        with session_factory() as db:
+            resolve(token, db)
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    return {
+        "mean_us": round(statistics.fmean(latencies) * 1e6, 1),
+        "p50_us": round(latencies[len(latencies) // 2] * 1e6, 1),
+        "p99_us": round(latencies[int(len(latencies) * 0.99) - 1] * 1e6, 1),
+    }
+
+
+def main():
+    args = parse_args()
+    tmpdir = use_database(args.database_url)
+
+    from app import auth, migrations
+    from app.database import SessionLocal, get_engine
+    from bench import seed
+
+    engine = get_engine()
+    migrations.upgrade(engine)
+    seed.seed(engine, "-", args.users, 0, 0, 0, args.seed)
+    rnd = random.Random(args.seed)
+    user_ids = [rnd.randint(1, args.users) for _ in range(args.calls)]
+    tokens = [auth.create_access_token({"sub": str(user_id)}) for user_id in user_ids]
+
+    def claims_only(token, db):
+        return auth.get_current_user_id(token)
+
+    def principal(token, db):
+        return auth.get_current_principal(auth.get_current_user_id(token), db)
+
+    def principal_miss(token, db):
+        user_id = auth.get_current_user_id(token)
+        auth.invalidate_user(user_id)
+        return auth.get_current_principal(user_id, db)
+
+    def db_lookup(token, db):
+        return auth.get_current_user(auth.get_current_user_id(token), db)
+
+    results = {"users": args.users, "calls": args.calls, "database": engine.dialect.name}
+    ## 적중 측정 전에 모든 유저를 캐시에 채움
+    timed_calls(SessionLocal, tokens, principal)
+    for name, resolve in (("claims_only", claims_only), ("cached_principal", principal),
+                          ("principal_miss", principal_miss), ("db_lookup", db_lookup)):
+        results[name] = timed_calls(SessionLocal, tokens, resolve)
+        print(f"{name:>16}: mean {results[name]['mean_us']}us  p50 {results[name]['p50_us']}us  "
+              f"p99 {results[name]['p99_us']}us")
+    results["user_cache"] = auth.user_cache_stats()
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    engine.dispose()
+    if tmpdir:
+        tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
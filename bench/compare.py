@@ -0,0 +1,31 @@
+import argparse
+import json
+
+"""두 번의 벤치마크 결과(JSON) 비교: python -m bench.compare before.json after.json"""
+
+METRICS = ("rps", "p50_ms", "p95_ms", "p99_ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="벤치마크 결과 비교")
+    parser.add_argument("before")
+    parser.add_argument("after")
+    args = parser.parse_args()
+
+    with open(args.before, encoding="utf-8") as f:
+        before = json.load(f)["results"]
+    with open(args.after, encoding="utf-8") as f:
+        after = json.load(f)["results"]
+
+    print(f"{'scenario':>13}  " + "  ".join(f"{m:>24}" for m in METRICS))
+    for name in (name for name in before if name in after):
+        cells = []
+        for metric in METRICS:
+            old, new = before[name][metric], after[name][metric]
+            change = (new - old) / old * 100 if old else 0.0
+            cells.append(f"{old:>8} -> {new:>8} ({change:+6.1f}%)")
+        print(f"{name:>13}  " + "  ".join(cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+import os
+import tempfile
+
+"""벤치마크용 DB 설정 (app을 import하기 전에 호출해야 DATABASE_URL이 적용됨)"""
+
+
+## database_url이 없으면 임시 SQLite 파일 사용, 임시 디렉토리(끝나면 cleanup) 또는 None 반환
+def use_database(database_url: str | None) -> tempfile.TemporaryDirectory | None:
+    tmpdir = None
+    if database_url:
+        os.environ["DATABASE_URL"] = database_url
+    else:
+        tmpdir = tempfile.TemporaryDirectory()
+        os.environ["DATABASE_URL"] = f"sqlite:///{tmpdir.name}/bench.db"
+    os.environ.setdefault("SECRET_KEY", "bench-secret")
+    os.environ.setdefault("GEMINI_API_KEY", "bench")
+    ## 벤치마크에서는 해싱 비용을 낮춰서 DB/직렬화 비용 위주로 측정
+    os.environ.setdefault("BCRYPT_ROUNDS", "4")
+    return tmpdir
+
+
+## 실행 계획 (SQLite는 EXPLAIN QUERY PLAN, MySQL은 EXPLAIN) 각 행을 문자열로 반환
+def explain(conn, stmt) -> list[str]:
+    compiled = stmt.compile(dialect=conn.dialect)
+    params = compiled.construct_params()
+    if compiled.positiontup is not None:
+        params = tuple(params[name] for name in compiled.positiontup)
+    prefix = "EXPLAIN QUERY PLAN" if conn.dialect.name == "sqlite" else "EXPLAIN"
+    rows = conn.exec_driver_sql(f"{prefix} {compiled.string}", params).all()
+    return [" | ".join(str(value) for value in row) for row in rows]
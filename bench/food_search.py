@@ -0,0 +1,114 @@
+import argparse
+import json
+import random
+import statistics
+import time
+
+from bench.db import use_database
+
+"""음식 이름 검색 비교: 예전 ILIKE '%name%' (전체 ORM 조회 / limit 적용) vs 메모리 n-gram 인덱스 (GET /foods/search)
+
+python -m bench.food_search --foods 100000 --queries 500
+"""
+
+LIMIT = 20
+BATCH_SIZE = 50000
+## 이름 조합용 단어 (자주 나오는 검색어부터 거의 없는 검색어까지 섞이도록)
+BASES = ("닭", "소고기", "돼지", "김치", "된장", "계란", "두부", "고등어", "오징어", "감자", "버섯", "시금치", "참치", "새우")
+DISHES = ("볶음", "찌개", "국", "구이", "무침", "전", "볶음밥", "조림", "튀김", "샐러드", "덮밥", "말이")
+QUERIES = ("닭", "김치찌개", "볶음밥", "고등어구이", "샐러드", "두부조림", "말이", "새우튀김", "없는음식")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="음식 이름 검색 지연 시간 비교")
+    parser.add_argument("--database-url", help="기본값: 임시 SQLite 파일 (MySQL이면 빈 DB를 지정)")
+    parser.add_argument("--foods", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="결과 JSON 파일 경로")
+    return parser.parse_args()
+
+
+def seed(engine, foods: int, rnd: random.Random) -> None:
+    from app import models
+
+    for offset in range(0, foods, BATCH_SIZE):
+        rows = [
+            {"name": f"{rnd.choice(BASES)}{rnd.choice(DISHES)} {i}", "unit": 100, "calories_per_unit": rnd.randint(20, 600),
+             "protein_per_unit": 10, "carbs_per_unit": 20, "fat_per_unit": 5, "allergen_mask": 0}
+            for i in range(offset, min(offset + BATCH_SIZE, foods))
+        ]
+        with engine.begin() as conn:
+            conn.execute(models.Food.__table__.insert(), rows)
+
+
+def timed(queries: list[str], search) -> tuple[dict, dict]:
+    latencies = []
+    counts = {}
+    for query in queries:
+        started = time.perf_counter()
+        counts[query] = len(search(query))
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    return {
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 3),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 3),
+    }, counts
+
+
+def main():
+    args = parse_args()
+    tmpdir = use_database(args.database_url)
+
+    from sqlalchemy import select
+
+    from app import migrations, models
+    from app.database import SessionLocal, get_engine
+    from app.food_index import FoodSearchIndex
+
+    engine = get_engine()
+    migrations.upgrade(engine)
+    rnd = random.Random(args.seed)
+    seed(engine, args.foods, rnd)
+    queries = [rnd.choice(QUERIES) for _ in range(args.queries)]
+
+    index = FoodSearchIndex()
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        index.load(db)
+    report = {"foods": args.foods, "database": engine.dialect.name,
+              "index_load_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+    with SessionLocal() as db:
+        ## 변경 전 GET /foods/search: 일치하는 음식 전체를 ORM 객체로 조회
+        def ilike_all(query):
+            return db.query(models.Food).filter(models.Food.name.ilike(f"%{query}%")).all()
+
+        ## 같은 ILIKE에 인덱스 검색과 같은 limit 적용 (컬럼 2개만)
+        def ilike_limit(query):
+            stmt = select(models.Food.food_id, models.Food.name).where(models.Food.name.ilike(f"%{query}%")).limit(LIMIT)
+            return db.execute(stmt).all()
+
+        report["ilike_all"], all_counts = timed(queries, ilike_all)
+        report["ilike_limit"], _ = timed(queries, ilike_limit)
+    report["index"], _ = timed(queries, lambda query: index.search(query, LIMIT))
+    ## limit 없이 찾은 음식 수가 ILIKE와 같은지 (검색어별)
+    _, index_counts = timed(sorted(set(queries)), lambda query: index.search(query, args.foods))
+    report["matches"] = all_counts
+    report["same_matches"] = all_counts == index_counts
+
+    print(f"foods {args.foods} ({report['database']}), index load {report['index_load_ms']}ms")
+    for name in ("ilike_all", "ilike_limit", "index"):
+        print(f"{name:>12}: mean {report[name]['mean_ms']}ms  p50 {report[name]['p50_ms']}ms  p99 {report[name]['p99_ms']}ms")
+    print(f"{'same_matches':>12}: {report['same_matches']}  {all_counts}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    engine.dispose()
+    if tmpdir:
+        tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+from bench.db import use_database
+
+"""동시 로그인 지연 시간 측정: 실제 bcrypt cost(기본 12)로 로그인 요청을 한꺼번에 보내고
+로그인 지연 시간과 그동안의 이벤트 루프 지연(다른 요청이 처리되지 못하는 시간)을 측정
+pool: bcrypt 전용 스레드 풀 (서비스와 같은 방식), inline: 이벤트 루프에서 바로 해싱 (예전 방식)
+
+python -m bench.login --logins 200 --concurrency 200
+python -m bench.login --modes inline
+
+inline은 해싱하는 동안 이벤트 루프 전체가 멈춰서 다른 요청의 커넥션 대기가 풀 타임아웃(30초)을 넘기므로
+오류(500)가 섞이고 오래 걸림, 그래서 기본 모드에서는 제외
+"""
+
+MODES = ("pool",)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="동시 로그인 지연 시간 측정")
+    parser.add_argument("--database-url", help="기본값: 임시 SQLite 파일")
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost (서비스 기본값 12)")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--logins", type=int, default=200, help="모드당 로그인 요청 수")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--probe-interval", type=float, default=0.01, help="이벤트 루프 지연 측정 간격 (초)")
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--out", help="결과 JSON 파일 경로")
+    return parser.parse_args()
+
+
+## done이 설정될 때까지 interval마다 깨어나서 예정보다 늦게 깨어난 시간을 기록
+async def probe_loop_lag(interval: float, done: asyncio.Event) -> list[float]:
+    lags = []
+    while not done.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - started - interval)
+    return lags
+
+
+async def run(args) -> dict:
+    import httpx
+
+    from app import auth, main, migrations
+    from app.database import get_engine
+    from bench import seed
+    from bench.run import measure, percentile
+
+    engine = get_engine()
+    migrations.upgrade(engine)
+    seed.seed(engine, auth.get_password_hash(seed.PASSWORD), args.users, 0, 0, 0)
+
+    pooled = auth._run_in_hash_pool
+
+    async def inline(func, *func_args):
+        return func(*func_args)
+
+    def login(c, i):
+        return c.post("/login", data={"username": seed.email(i % args.users + 1), "password": seed.PASSWORD})
+
+    results = {}
+    ## 서버 오류(풀 타임아웃 등)는 예외 대신 500 응답으로 받아서 errors로 셈
+    transport = httpx.ASGITransport(app=main.app, raise_app_exceptions=False)
+    async with main.app.router.lifespan_context(main.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for mode in args.modes.split(","):
+                auth._run_in_hash_pool = pooled if mode == "pool" else inline
+                done = asyncio.Event()
+                probe = asyncio.create_task(probe_loop_lag(args.probe_interval, done))
+                results[mode] = await measure(client, login, args.logins, args.concurrency)
+                done.set()
+                lags = sorted(await probe)
+                results[mode].update({
+                    "loop_lag_p50_ms": round(percentile(lags, 50) * 1000, 2),
+                    "loop_lag_p99_ms": round(percentile(lags, 99) * 1000, 2),
+                    "loop_lag_max_ms": round(max(lags, default=0.0) * 1000, 2),
+                    "loop_lag_mean_ms": round(statistics.fmean(lags) * 1000, 2) if lags else 0.0,
+                })
+                r = results[mode]
+                print(f"{mode:>6}: {r['rps']:>7} logins/s  p50 {r['p50_ms']}ms  p95 {r['p95_ms']}ms  "
+                      f"p99 {r['p99_ms']}ms  errors {r['errors']}  "
+                      f"loop lag p99 {r['loop_lag_p99_ms']}ms  max {r['loop_lag_max_ms']}ms")
+    auth._run_in_hash_pool = pooled
+    results["hash_pool"] = auth.hash_pool_stats()
+    return results
+
+
+def main():
+    args = parse_args()
+    ## bench.db의 기본값(4)보다 먼저 지정해서 실제 해싱 비용으로 측정
+    os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+    tmpdir = use_database(args.database_url)
+    results = asyncio.run(run(args))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"config": {k: v for k, v in vars(args).items() if k not in ("out", "database_url")},
+                       "cpus": os.cpu_count(), "results": results}, f, ensure_ascii=False, indent=2)
+    if tmpdir:
+        tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
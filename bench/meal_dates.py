@@ -0,0 +1,155 @@
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import date, datetime, timedelta
+
+from bench.db import explain, use_database
+
+"""식사 날짜 조회 비교: func.date(datetime) = 날짜 (인덱스 없음) vs 하루 범위 [start, end) + (user_id, datetime) 인덱스
+
+python -m bench.meal_dates --meals 1000000 --users 1000 --queries 500
+"""
+
+PAGE_SIZE = 20
+BATCH_SIZE = 50000
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="식사 날짜 조회 실행 계획/지연 시간 비교")
+    parser.add_argument("--database-url", help="기본값: 임시 SQLite 파일 (MySQL이면 빈 DB를 지정)")
+    parser.add_argument("--meals", type=int, default=1000000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=365, help="식사 기록이 퍼져 있는 기간 (일)")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="결과 JSON 파일 경로")
+    return parser.parse_args()
+
+
+def seed(engine, users: int, meals: int, days: int, rnd: random.Random, first_day: date) -> None:
+    from app import models
+
+    with engine.begin() as conn:
+        conn.execute(models.User.__table__.insert(), [
+            {"email": f"meal-bench{i}@example.com", "hashed_pw": "-", "name": f"유저{i}", "gender": "M",
+             "height": 170, "weight": 70, "age": 30}
+            for i in range(1, users + 1)
+        ])
+    start = datetime.combine(first_day, datetime.min.time())
+    seconds = days * 86400
+    for offset in range(0, meals, BATCH_SIZE):
+        rows = [
+            {"user_id": rnd.randint(1, users), "meal_type": rnd.choice(("아침", "점심", "저녁")),
+             "datetime": start + timedelta(seconds=rnd.randrange(seconds))}
+            for _ in range(min(BATCH_SIZE, meals - offset))
+        ]
+        with engine.begin() as conn:
+            conn.execute(models.Meal.__table__.insert(), rows)
+
+
+## GET /meals?date=와 같은 모양의 쿼리 (유저의 하루 식사, 최신순 한 페이지)
+def page_query(user_id: int, condition):
+    from sqlalchemy import select
+
+    from app.models import Meal
+
+    return (
+        select(Meal.meal_id, Meal.meal_type, Meal.datetime)
+        .where(Meal.user_id == user_id, condition)
+        .order_by(Meal.datetime.desc(), Meal.meal_id.desc())
+        .limit(PAGE_SIZE + 1)
+    )
+
+
+## 변경 전: DB에 저장된 UTC 날짜를 함수로 꺼내서 비교 (인덱스를 쓸 수 없음)
+def func_date_condition(day: date):
+    from sqlalchemy import func
+
+    from app.models import Meal
+
+    return func.date(Meal.datetime) == day
+
+
+## 변경 후: 같은 하루를 반열린 구간으로 비교 (결과를 맞추기 위해 UTC 기준)
+def range_condition(day: date):
+    from app.models import Meal
+    from app.timeutil import local_day_range
+
+    start, end = local_day_range(day, "UTC")
+    return (Meal.datetime >= start) & (Meal.datetime < end)
+
+
+def run_variant(engine, queries: list[tuple[int, date]], condition) -> tuple[dict, list]:
+    latencies = []
+    results = []
+    with engine.connect() as conn:
+        user_id, day = queries[0]
+        plan = explain(conn, page_query(user_id, condition(day)))
+        for user_id, day in queries:
+            started = time.perf_counter()
+            rows = conn.execute(page_query(user_id, condition(day))).all()
+            latencies.append(time.perf_counter() - started)
+            results.append([row.meal_id for row in rows])
+    latencies.sort()
+    return {
+        "plan": plan,
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 3),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 3),
+    }, results
+
+
+def main():
+    args = parse_args()
+    tmpdir = use_database(args.database_url)
+
+    from app import migrations, models
+    from app.database import get_engine
+
+    engine = get_engine()
+    migrations.upgrade(engine)
+    rnd = random.Random(args.seed)
+    first_day = date.today() - timedelta(days=args.days)
+    started = time.perf_counter()
+    seed(engine, args.users, args.meals, args.days, rnd, first_day)
+    report = {"meals": args.meals, "users": args.users, "database": engine.dialect.name,
+              "seed_seconds": round(time.perf_counter() - started, 1)}
+    with engine.begin() as conn:
+        conn.exec_driver_sql("ANALYZE" if engine.dialect.name == "sqlite" else "ANALYZE TABLE meals")
+
+    queries = [(rnd.randint(1, args.users), first_day + timedelta(days=rnd.randrange(args.days)))
+               for _ in range(args.queries)]
+    index = next(i for i in models.Meal.__table__.indexes if i.name == "ix_meals_user_id_datetime")
+
+    results = {}
+    report["after"], results["after"] = run_variant(engine, queries, range_condition)
+    report["func_date_with_index"], results["func_date_with_index"] = run_variant(engine, queries, func_date_condition)
+    ## 마이그레이션 0001 이전 상태 (user_id, datetime 인덱스 없음), 측정 후 인덱스 복구
+    index.drop(engine)
+    ## SQLite 연결이 캐시한 구문(예전 실행 계획)을 쓰지 않도록 풀을 비움
+    engine.dispose()
+    try:
+        report["before"], results["before"] = run_variant(engine, queries, func_date_condition)
+    finally:
+        index.create(engine)
+    report["same_results"] = results["before"] == results["after"] == results["func_date_with_index"]
+
+    print(f"meals {args.meals} / users {args.users} ({report['database']}, seed {report['seed_seconds']}s)")
+    for name in ("before", "func_date_with_index", "after"):
+        variant = report[name]
+        print(f"{name:>21}: mean {variant['mean_ms']}ms  p50 {variant['p50_ms']}ms  p99 {variant['p99_ms']}ms")
+        for line in variant["plan"]:
+            print(f"{'':>23}{line}")
+    print(f"{'same_results':>21}: {report['same_results']}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    engine.dispose()
+    if tmpdir:
+        tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
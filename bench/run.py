@@ -0,0 +1,153 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import time
+from datetime import datetime, timezone
+
+from bench.db import use_database
+
+"""API 부하 테스트: 로컬 DB를 채우고 app을 프로세스 안에서 호출해서 req/s, p50/p95/p99 측정
+
+python -m bench.run --users 50 --foods 2000 --meals 200 --requests 500 --concurrency 20 --out before.json
+"""
+
+SCENARIOS = ("login", "meals", "inventory", "inventory_add", "foods_search", "ai_diet", "ai_diet_phrase")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Balance Eat API 벤치마크")
+    parser.add_argument("--database-url", help="기본값: 임시 SQLite 파일")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--foods", type=int, default=1000)
+    parser.add_argument("--meals", type=int, default=100, help="유저당 식사 수")
+    parser.add_argument("--inventory", type=int, default=30, help="유저당 재고 수")
+    parser.add_argument("--requests", type=int, default=200, help="시나리오당 요청 수")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--gemini-latency", type=float, default=0.0, help="가짜 Gemini 응답 지연 (초)")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="결과 JSON 파일 경로")
+    return parser.parse_args()
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def measure(client, make_request, total: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def one(i: int):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            response = await make_request(client, i)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    wall = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": errors,
+        "rps": round(total / wall, 1),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+async def run(args) -> dict:
+    import httpx
+
+    from app import auth, diet_jobs, main, migrations
+    from app.database import get_engine
+    from bench import seed
+
+    async def fake_gemini(prompt: str) -> str:
+        await asyncio.sleep(args.gemini_latency)
+        return "아침: 현미밥, 점심: 닭가슴살, 저녁: 두부"
+
+    main.ask_gemini = fake_gemini
+    diet_jobs.ask_gemini = fake_gemini
+
+    engine = get_engine()
+    migrations.upgrade(engine)
+    seed.seed(engine, auth.get_password_hash(seed.PASSWORD), args.users, args.foods,
+              args.meals, args.inventory, args.seed)
+
+    rnd = random.Random(args.seed)
+    search_terms = [f"음식{rnd.randint(1, args.foods)}"[:rnd.randint(2, 4)] for _ in range(100)]
+    requests = {
+        "login": lambda c, i: c.post("/login", data={"username": seed.email(i % args.users + 1), "password": seed.PASSWORD}),
+        "meals": lambda c, i: c.get("/meals", params={"limit": 20}, headers=tokens[i % args.users]),
+        "inventory": lambda c, i: c.get("/inventory", headers=tokens[i % args.users]),
+        ## 같은 유저/음식에 동시에 재고 추가 (끝난 뒤 수량이 요청 수만큼 늘었는지 확인)
+        "inventory_add": lambda c, i: c.post("/inventory", json={"food_id": 1, "quantity": 1}, headers=tokens[0]),
+        "foods_search": lambda c, i: c.get("/foods/search", params={"name": search_terms[i % len(search_terms)]}),
+        "ai_diet": lambda c, i: c.get("/ai-diet", headers=tokens[i % args.users]),
+        ## 로컬 플래너 + 가짜 Gemini 설명 문장
+        "ai_diet_phrase": lambda c, i: c.get("/ai-diet", params={"phrase": "true"}, headers=tokens[i % args.users]),
+    }
+
+    async def inventory_quantity(client, food_id: int) -> int:
+        response = await client.get("/inventory", headers=tokens[0])
+        return next((inv["quantity"] for inv in response.json() if inv["food_id"] == food_id), 0)
+
+    results = {}
+    transport = httpx.ASGITransport(app=main.app)
+    async with main.app.router.lifespan_context(main.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            tokens = []
+            for u in range(1, args.users + 1):
+                token = auth.create_access_token(data={"sub": str(u)})
+                tokens.append({"Authorization": f"Bearer {token}"})
+            for name in args.scenarios.split(","):
+                await measure(client, requests[name], min(args.concurrency, args.requests), args.concurrency)
+                if name == "inventory_add":
+                    before = await inventory_quantity(client, 1)
+                results[name] = await measure(client, requests[name], args.requests, args.concurrency)
+                if name == "inventory_add":
+                    lost = before + args.requests - await inventory_quantity(client, 1)
+                    results[name]["lost_updates"] = lost
+                    print(f"{name:>13}: 동시 추가 {args.requests}건 중 누락 {lost}건")
+                print(f"{name:>13}: {results[name]['rps']:>8} req/s  p50 {results[name]['p50_ms']}ms  "
+                      f"p95 {results[name]['p95_ms']}ms  p99 {results[name]['p99_ms']}ms  errors {results[name]['errors']}")
+    return results
+
+
+def main():
+    args = parse_args()
+    tmpdir = use_database(args.database_url)
+
+    results = asyncio.run(run(args))
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("out", "database_url")},
+        "database": os.environ["DATABASE_URL"].split(":")[0],
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if tmpdir:
+        tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import random
+from datetime import date, datetime, timedelta
+
+from sqlalchemy.engine import Engine
+
+from app import models
+from app.allergens import ALLERGENS, food_mask
+from app.nutrition import rebuild_daily_nutrition
+
+"""벤치마크용 데이터 생성 (유저/음식/식사/재고)"""
+
+PASSWORD = "benchpass"
+BATCH_SIZE = 5000
+
+
+def _chunks(rows: list, size: int = BATCH_SIZE):
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+def _insert(conn, table, rows: list[dict]) -> None:
+    for chunk in _chunks(rows):
+        conn.execute(table.insert(), chunk)
+
+
+def email(i: int) -> str:
+    return f"bench{i}@example.com"
+
+
+## 고정 seed로 같은 데이터를 생성 (두 번의 실행 결과를 비교할 수 있도록)
+def seed(engine: Engine, hashed_pw: str, users: int, foods: int, meals_per_user: int,
+         inventory_per_user: int, seed_value: int = 42) -> None:
+    rnd = random.Random(seed_value)
+    today = date.today()
+    with engine.begin() as conn:
+        food_rows = []
+        for i in range(1, foods + 1):
+            allergens = rnd.choice(ALLERGENS) if rnd.random() < 0.2 else None
+            name = f"음식{i}"
+            food_rows.append({
+                "food_id": i, "name": name, "unit": 100,
+                "calories_per_unit": rnd.randint(20, 600), "protein_per_unit": rnd.randint(0, 40),
+                "carbs_per_unit": rnd.randint(0, 80), "fat_per_unit": rnd.randint(0, 30),
+                "allergens": allergens, "allergen_mask": food_mask(name, allergens),
+            })
+        _insert(conn, models.Food.__table__, food_rows)
+
+        _insert(conn, models.User.__table__, [
+            {"user_id": u, "email": email(u), "hashed_pw": hashed_pw, "name": f"user{u}", "gender": "M",
+             "height": 175, "weight": 70, "age": 30, "allergies": None, "allergen_mask": 0}
+            for u in range(1, users + 1)
+        ])
+        _insert(conn, models.Goal.__table__, [
+            {"user_id": u, "weight": 65, "date": today + timedelta(days=90)} for u in range(1, users + 1)
+        ])
+
+        inventory_rows = []
+        for u in range(1, users + 1):
+            for food_id in rnd.sample(range(1, foods + 1), min(inventory_per_user, foods)):
+                inventory_rows.append({"user_id": u, "food_id": food_id, "quantity": rnd.randint(1, 5)})
+        _insert(conn, models.UserFoodInventory.__table__, inventory_rows)
+
+        meal_rows = []
+        meal_food_rows = []
+        meal_id = 0
+        for u in range(1, users + 1):
+            for m in range(meals_per_user):
+                meal_id += 1
+                meal_rows.append({
+                    "meal_id": meal_id, "user_id": u, "meal_type": ("아침", "점심", "저녁")[m % 3],
+                    "datetime": datetime.now() - timedelta(hours=8 * m + rnd.randint(0, 5)),
+                })
+                for food_id in rnd.sample(range(1, foods + 1), min(rnd.randint(1, 4), foods)):
+                    food = food_rows[food_id - 1]
+                    quantity = rnd.randint(1, 3)
+                    meal_food_rows.append({
+                        "meal_id": meal_id, "food_id": food_id, "quantity": quantity,
+                        **{k: food[f"{k}_per_unit"] * quantity for k in ("calories", "protein", "carbs", "fat")},
+                    })
+        _insert(conn, models.Meal.__table__, meal_rows)
+        _insert(conn, models.MealFood.__table__, meal_food_rows)
+        rebuild_daily_nutrition(conn)
@@ -0,0 +1,94 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import List
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.food_schemas import InventoryOut, MealOut
+from app.responses import model_response
+
+"""응답 직렬화 비용 측정 (FastAPI 기본 경로 vs orjson vs 한 번만 검증)
+
+python -m bench.serialization --rows 1000 10000
+"""
+
+
+def meal_rows(n: int, rnd: random.Random) -> list[dict]:
+    rows = []
+    for i in range(n):
+        foods = [
+            {"food_name": f"음식{rnd.randint(1, 5000)}", "quantity": rnd.randint(1, 3),
+             "calories": rnd.randint(50, 800) + 0.5, "protein": rnd.randint(0, 40) + 0.25,
+             "carbs": rnd.randint(0, 80) + 0.1, "fat": rnd.randint(0, 30) + 0.3}
+            for _ in range(rnd.randint(1, 4))
+        ]
+        rows.append({
+            "meal_id": i, "datetime": "2025-05-01T12:00:00", "meal_type": "점심",
+            "total": {key: sum(food[key] for food in foods) for key in ("calories", "protein", "carbs", "fat")},
+            "foods": foods,
+        })
+    return rows
+
+
+def inventory_rows(n: int, rnd: random.Random) -> list[dict]:
+    return [{"food_id": i, "food_name": f"음식{i}", "quantity": rnd.randint(1, 9)} for i in range(n)]
+
+
+## FastAPI가 response_model이 있는 dict 응답을 처리하는 방식 (검증/변환 후 응답 클래스로 인코딩)
+def fastapi_path(model, response_class):
+    field = create_model_field(name="Response", type_=model, mode="serialization")
+    loop = asyncio.new_event_loop()
+
+    def run(rows):
+        content = loop.run_until_complete(serialize_response(field=field, response_content=rows))
+        return response_class(content).body
+    return run
+
+
+def timed(fn, rows, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(rows)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="응답 직렬화 마이크로벤치마크")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out", help="결과 JSON 파일 경로")
+    args = parser.parse_args()
+
+    rnd = random.Random(42)
+    results = {}
+    for name, model, make_rows in (
+        ("meals", List[MealOut], meal_rows),
+        ("inventory", List[InventoryOut], inventory_rows),
+    ):
+        paths = {
+            "fastapi_json": fastapi_path(model, JSONResponse),
+            "fastapi_orjson": fastapi_path(model, ORJSONResponse),
+            "model_response": lambda rows, model=model: model_response(model, rows).body,
+        }
+        for n in args.rows:
+            rows = make_rows(n, rnd)
+            bodies = {path: json.loads(fn(rows)) for path, fn in paths.items()}
+            assert all(body == bodies["fastapi_json"] for body in bodies.values()), "직렬화 결과가 다릅니다"
+            key = f"{name}_{n}"
+            results[key] = {path: round(timed(fn, rows, args.repeat), 2) for path, fn in paths.items()}
+            print(f"{key:>16}: " + "  ".join(f"{path} {ms}ms" for path, ms in results[key].items()))
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import argparse
+import json
+import random
+import statistics
+import time
+
+from app.food_similarity import FoodSimilarityIndex
+
+"""비슷한 음식 검색(/foods/{food_id}/similar) 인덱스의 조회/추가 시간 측정
+
+python -m bench.similarity --foods 100000 --queries 2000
+"""
+
+
+def build_rows(n: int, rnd: random.Random):
+    for food_id in range(1, n + 1):
+        values = (rnd.uniform(10, 900), rnd.uniform(0, 60), rnd.uniform(0, 90), rnd.uniform(0, 50))
+        mask = 1 << rnd.randrange(19) if rnd.random() < 0.2 else 0
+        yield food_id, f"음식{food_id}", values, mask
+
+
+def timed_queries(index: FoodSimilarityIndex, food_ids: list[int], **kwargs) -> dict:
+    latencies = []
+    for food_id in food_ids:
+        started = time.perf_counter()
+        index.similar(food_id, **kwargs)
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    return {
+        "mean_us": round(statistics.fmean(latencies) * 1e6, 1),
+        "p50_us": round(latencies[len(latencies) // 2] * 1e6, 1),
+        "p99_us": round(latencies[int(len(latencies) * 0.99) - 1] * 1e6, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="비슷한 음식 검색 벤치마크")
+    parser.add_argument("--foods", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--out", help="결과 JSON 파일 경로")
+    args = parser.parse_args()
+
+    rnd = random.Random(42)
+    index = FoodSimilarityIndex()
+    started = time.perf_counter()
+    index.load_rows(build_rows(args.foods, rnd))
+    results = {"foods": args.foods, "load_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+    food_ids = [rnd.randint(1, args.foods) for _ in range(args.queries)]
+    results["similar"] = timed_queries(index, food_ids, k=args.k)
+    results["similar_constrained"] = timed_queries(
+        index, food_ids, k=args.k, exclude_mask=0b111, bounds={"calories": (None, 500)}, less=("fat",)
+    )
+
+    started = time.perf_counter()
+    for food_id, name, values, mask in build_rows(1000, rnd):
+        index.add(args.foods + food_id, name, values, mask)
+    results["add_us"] = round((time.perf_counter() - started) / 1000 * 1e6, 1)
+
+    for key, value in results.items():
+        print(f"{key:>20}: {value}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import itertools
+import os
+import tempfile
+from contextlib import contextmanager
+
+import pytest
+
+## app을 import하기 전에 임시 SQLite 파일을 DB로 지정 (.env의 DB 설정으로 테스트가 실행되지 않도록 덮어씀)
+_tmpdir = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir.name}/test.db"
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("GEMINI_API_KEY", "test")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+## 다른 프로세스의 음식 변경을 바로 확인하도록 음식 목록 버전을 매 요청마다 확인
+os.environ.setdefault("FOOD_CATALOG_CHECK_INTERVAL", "0")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app import main, models
+from app.database import SessionLocal, get_async_engine, get_engine
+
+"""테스트 공통 fixture: 임시 SQLite DB로 서버 실행, 유저/음식 생성, SQL 실행 횟수 측정"""
+
+_ids = itertools.count(1)
+
+
+## 서버 시작(lifespan: 마이그레이션, 인덱스 생성)은 테스트 전체에서 한 번
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(main.app) as c:
+        yield c
+    _tmpdir.cleanup()
+
+
+## 새 유저를 만들고 로그인한 Authorization 헤더를 반환하는 함수
+@pytest.fixture
+def make_user(client):
+    def make() -> dict:
+        email = f"user{next(_ids)}@example.com"
+        response = client.post("/signup", json={
+            "email": email, "password": "pw", "name": "테스트", "gender": "M",
+            "height": 170, "weight": 70, "age": 30, "allergies": "",
+            "goal": {"weight": 65, "date": "2030-01-01T00:00:00"},
+        })
+        assert response.status_code == 201, response.text
+        response = client.post("/login", data={"username": email, "password": "pw"})
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+    return make
+
+
+## 테스트마다 새 유저
+@pytest.fixture
+def auth_headers(make_user):
+    return make_user()
+
+
+## n개의 음식을 DB에 바로 추가하고 food_id 목록 반환
+@pytest.fixture
+def make_foods(client):
+    def make(n: int) -> list[int]:
+        prefix = f"테스트음식{next(_ids)}-"
+        with SessionLocal() as db:
+            foods = [
+                models.Food(
+                    name=f"{prefix}{i}", unit=100, calories_per_unit=100 + i,
+                    protein_per_unit=10, carbs_per_unit=20, fat_per_unit=3,
+                )
+                for i in range(n)
+            ]
+            db.add_all(foods)
+            db.commit()
+            return [food.food_id for food in foods]
+    return make
+
+
+## with 블록 안에서 실행된 SQL 문 목록 (동기/비동기 엔진 모두, executemany도 한 번으로 셈)
+@pytest.fixture
+def count_statements(client):
+    @contextmanager
+    def count():
+        statements = []
+
+        def on_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engines = (get_engine(), get_async_engine().sync_engine)
+        for engine in engines:
+            event.listen(engine, "before_cursor_execute", on_execute)
+        try:
+            yield statements
+        finally:
+            for engine in engines:
+                event.remove(engine, "before_cursor_execute", on_execute)
+    return count
@@ -0,0 +1,71 @@
+import json
+
+from app.allergens import food_mask, from_mask, name_mask, to_mask, unknown_names
+
+"""알레르기 비트마스크 변환과 알레르기 제외 조회 (공개 엔드포인트는 exclude_allergens=true일 때만 로그인 확인)"""
+
+
+def test_to_mask_reads_names_and_aliases():
+    assert from_mask(to_mask("땅콩, 우유")) == ["우유", "땅콩"]
+    assert from_mask(to_mask("계란/콩")) == ["난류", "대두"]
+    assert to_mask("오이") == 0
+    assert to_mask(None) == 0
+
+
+def test_name_mask_matches_words_not_single_letters_inside_words():
+    ## 한 글자 알레르기(밀, 게)는 단어 전체가 같을 때만
+    assert name_mask("밀감") == 0
+    assert from_mask(name_mask("밀가루빵")) == ["밀"]
+    assert from_mask(name_mask("게 튀김")) == ["게"]
+    assert from_mask(name_mask("꽃게탕")) == ["게"]
+    assert from_mask(name_mask("두부")) == ["대두"]
+    assert from_mask(food_mask("두부", "땅콩")) == ["땅콩", "대두"]
+
+
+def test_unknown_names_keeps_items_without_a_bit():
+    assert unknown_names("땅콩, 오이") == ("오이",)
+    assert unknown_names("복숭아 통조림, 키위") == ("복숭아 통조림", "통조림", "키위")
+    assert unknown_names("") == ()
+
+
+## 알레르기가 있는 유저와 음식 3개(알레르기 비트, 비트 없는 알레르기 이름, 안전한 음식)를 만들고 (헤더, 음식 이름 -> id) 반환
+def _allergic_user_and_foods(client, make_user) -> tuple[dict, dict[str, int]]:
+    headers = make_user()
+    response = client.patch("/profile/allergies", params={"allergies": "땅콩, 밀, 오이"}, headers=headers)
+    assert response.status_code == 200, response.text
+    food_ids = {}
+    for name in ("땅콩버터", "오이", "밀감"):
+        food = {"name": name, "unit": 100, "calories_per_unit": 80, "protein_per_unit": 5, "carbs_per_unit": 10, "fat_per_unit": 1}
+        response = client.post("/foods", json=food, headers=headers)
+        assert response.status_code == 200, response.text
+        food_ids[name] = response.json()["food_id"]
+    return headers, food_ids
+
+
+def test_exclude_allergens_on_inventory_and_foods(client, make_user):
+    headers, food_ids = _allergic_user_and_foods(client, make_user)
+    items = [{"food_id": food_id, "quantity": 1} for food_id in food_ids.values()]
+    assert client.post("/inventory/bulk", json={"items": items}, headers=headers).status_code == 200
+
+    inventory = client.get("/inventory", params={"exclude_allergens": "true"}, headers=headers).json()
+    assert [item["food_name"] for item in inventory] == ["밀감"]
+    assert len(client.get("/inventory", headers=headers).json()) == 3
+
+    names = {food["name"] for food in client.get("/foods", params={"exclude_allergens": "true"}, headers=headers).json()}
+    assert "밀감" in names and not names & {"땅콩버터", "오이"}
+    response = client.get("/foods", params={"format": "ndjson", "exclude_allergens": "true"}, headers=headers)
+    names = {json.loads(line)["name"] for line in response.text.splitlines()}
+    assert "밀감" in names and not names & {"땅콩버터", "오이"}
+    assert {"땅콩버터", "오이", "밀감"} <= {food["name"] for food in client.get("/foods").json()}
+
+
+def test_public_food_endpoints_ignore_token_without_exclude_allergens(client, auth_headers):
+    food = {"name": "공개조회음식", "unit": 100, "calories_per_unit": 80, "protein_per_unit": 5, "carbs_per_unit": 10, "fat_per_unit": 1}
+    food_id = client.post("/foods", json=food, headers=auth_headers).json()["food_id"]
+    headers = {"Authorization": "Bearer bad"}
+    assert client.get("/foods", headers=headers).status_code == 200
+    assert client.get("/foods/search", params={"name": "테스트"}, headers=headers).status_code == 200
+    assert client.get(f"/foods/{food_id}/similar", headers=headers).status_code == 200
+    ## 알레르기 제외를 요청하면 로그인 필요
+    assert client.get("/foods", params={"exclude_allergens": "true"}, headers=headers).status_code == 401
+    assert client.get("/foods", params={"exclude_allergens": "true"}).status_code == 401
@@ -0,0 +1,25 @@
+"""날짜/시간대 쿼리 파라미터: 잘못된 시간대나 범위를 벗어난 날짜는 500이 아니라 400"""
+
+BAD_TIMEZONES = ("Asia", "Nowhere/City", "a" * 300)
+
+
+def test_meals_rejects_invalid_timezone_and_out_of_range_date(client, auth_headers):
+    for tz in BAD_TIMEZONES:
+        response = client.get("/meals", params={"date": "2024-01-01", "tz": tz}, headers=auth_headers)
+        assert response.status_code == 400, (tz, response.text)
+    for date in ("9999-12-31", "0001-01-01"):
+        response = client.get("/meals", params={"date": date}, headers=auth_headers)
+        assert response.status_code == 400, (date, response.text)
+    assert client.get("/meals", params={"date": "2024-01-01", "tz": "Asia/Seoul"}, headers=auth_headers).status_code == 200
+
+
+def test_nutrition_summary_rejects_invalid_timezone_and_out_of_range_dates(client, auth_headers):
+    for tz in BAD_TIMEZONES:
+        params = {"from": "2024-01-01", "to": "2024-01-31", "tz": tz}
+        response = client.get("/nutrition/summary", params=params, headers=auth_headers)
+        assert response.status_code == 400, (tz, response.text)
+    for first, last in (("2024-01-01", "9999-12-31"), ("0001-01-01", "2024-01-31")):
+        response = client.get("/nutrition/summary", params={"from": first, "to": last}, headers=auth_headers)
+        assert response.status_code == 400, (first, last, response.text)
+    params = {"from": "2024-01-01", "to": "2024-01-31", "granularity": "week", "tz": "Asia/Seoul"}
+    assert client.get("/nutrition/summary", params=params, headers=auth_headers).status_code == 200
@@ -0,0 +1,95 @@
+import json
+
+from sqlalchemy import select
+
+from app import food_catalog, food_import, models
+from app.database import SessionLocal
+
+"""음식 등록/일괄 등록: 다른 워커/CLI 일괄 등록의 변경 반영, 업로드는 기존 음식을 바꾸지 않음"""
+
+
+def test_foods_imported_by_another_process_reach_running_server(client):
+    name = "다른프로세스등록음식"
+    etag = client.get("/foods").headers["etag"]
+    assert client.get("/foods/search", params={"name": name}).json() == []
+
+    ## python -m app.food_import와 같은 경로 (서버의 인덱스/캐시는 건드리지 않음)
+    with SessionLocal() as db:
+        food_import.import_foods(db, [{
+            "name": name, "unit": 100, "calories_per_unit": 120, "protein_per_unit": 10,
+            "carbs_per_unit": 15, "fat_per_unit": 2, "allergen_mask": 0,
+        }])
+
+    results = client.get("/foods/search", params={"name": name}).json()
+    assert [food["name"] for food in results] == [name]
+    assert client.get(f"/foods/{results[0]['food_id']}/similar").status_code == 200
+    response = client.get("/foods", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert name in {food["name"] for food in response.json()}
+
+
+def test_food_added_through_api_is_searchable(client, auth_headers):
+    name = "API등록음식"
+    food = {"name": name, "unit": 100, "calories_per_unit": 80, "protein_per_unit": 5, "carbs_per_unit": 10, "fat_per_unit": 1}
+    response = client.post("/foods", json=food, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    assert [found["name"] for found in client.get("/foods/search", params={"name": name}).json()] == [name]
+    assert client.post("/foods", json=food, headers=auth_headers).status_code == 400
+
+
+def test_bulk_upload_only_adds_new_foods(client, auth_headers, make_foods):
+    food_id = make_foods(1)[0]
+    existing = client.get("/foods").json()
+    name = next(food["name"] for food in existing if food["food_id"] == food_id)
+    csv_text = f"대표명,열량,탄수화물,단백질,지방\n{name},999,1,1,1\n업로드새음식,50,5,5,1\n업로드새음식,60,5,5,1\n"
+    response = client.post("/foods/bulk", files={"file": ("foods.csv", csv_text.encode())}, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    assert (response.json()["rows"], response.json()["inserted"]) == (3, 1)
+    foods = {food["name"]: food for food in client.get("/foods").json()}
+    assert foods[name]["calories_per_unit"] != 999
+    assert "업로드새음식" in foods
+
+
+def test_bulk_upload_rejects_unknown_encoding_and_reports_partial_import(client, auth_headers):
+    files = {"file": ("foods.csv", "대표명,열량,탄수화물,단백질,지방\n".encode())}
+    response = client.post("/foods/bulk", params={"encoding": "bogus"}, files=files, headers=auth_headers)
+    assert response.status_code == 400
+
+    ## 두 번째 배치의 잘못된 값에서 멈추면 첫 배치는 남음
+    csv_text = "대표명,열량,탄수화물,단백질,지방\n부분등록음식1,50,5,5,1\n부분등록음식2,abc,5,5,1\n"
+    response = client.post("/foods/bulk", params={"batch_size": 1}, files={"file": ("foods.csv", csv_text.encode())}, headers=auth_headers)
+    assert response.status_code == 400
+    assert "1행" in response.json()["detail"]
+    names = {food["name"] for food in client.get("/foods").json()}
+    assert "부분등록음식1" in names and "부분등록음식2" not in names
+
+
+def test_add_food_rejects_non_finite_negative_and_out_of_range_nutrients(client, auth_headers):
+    for value in (float("nan"), float("inf"), -5, 1e12):
+        food = {"name": f"잘못된영양음식{value}", "unit": 100, "calories_per_unit": value,
+                "protein_per_unit": 1, "carbs_per_unit": 1, "fat_per_unit": 1}
+        ## NaN/Infinity는 표준 JSON이 아니므로 json.dumps 그대로 전송 (클라이언트가 보낼 수 있는 형태)
+        response = client.post("/foods", content=json.dumps(food), headers={**auth_headers, "Content-Type": "application/json"})
+        assert response.status_code == 422, (value, response.text)
+
+
+def test_bulk_upload_rejects_non_finite_negative_and_out_of_range_nutrients(client, auth_headers):
+    for value in ("nan", "inf", "-1", "1e12"):
+        name = f"잘못된업로드음식{value}"
+        csv_text = f"대표명,열량,탄수화물,단백질,지방\n{name},{value},5,5,1\n"
+        response = client.post("/foods/bulk", files={"file": ("foods.csv", csv_text.encode())}, headers=auth_headers)
+        assert response.status_code == 400, (value, response.text)
+        assert name not in {food["name"] for food in client.get("/foods").json()}
+
+
+def test_catalog_etag_is_shared_across_workers(client):
+    etag = client.get("/foods").headers["etag"]
+    ## 프로세스마다 다른 값 없이 DB 버전으로만 만들어서 어느 워커든 같은 ETag
+    with SessionLocal() as db:
+        version = db.scalar(select(models.FoodCatalogVersion.version))
+    assert etag == f'"{version}-0"'
+    ## 다른 워커(캐시가 비어 있는 프로세스)와 같은 상태
+    food_catalog.expire()
+    response = client.get("/foods", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
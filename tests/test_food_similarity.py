@@ -0,0 +1,27 @@
+from app.food_similarity import FoodSimilarityIndex
+
+"""비슷한 음식 인덱스: 잘못된 영양 성분 값(NaN/inf)이 다른 음식의 검색 결과를 망가뜨리지 않는지 확인"""
+
+
+def _rows(bad_values) -> list:
+    return [
+        (1, "현미밥", (150, 3, 32, 1), 0),
+        (2, "백미밥", (160, 3, 35, 0.5), 0),
+        (3, "닭가슴살", (110, 23, 0, 1.5), 0),
+        (4, "잘못된음식", bad_values, 0),
+    ]
+
+
+def test_non_finite_row_does_not_empty_similar_results():
+    for bad_values in ((float("nan"), 1, 1, 1), (float("inf"), 1, 1, 1), (1, float("-inf"), None, 1)):
+        index = FoodSimilarityIndex()
+        index.load_rows(_rows(bad_values))
+        ## 잘못된 값은 0으로 보고, 나머지 음식끼리의 거리는 그대로
+        results = index.similar(1, 3)
+        assert [food["food_id"] for food in results][0] == 2, bad_values
+        assert {food["food_id"] for food in results} == {2, 3, 4}
+        assert len(index.similar(4, 3)) == 3
+
+        ## 새로 추가된 음식도 같은 처리
+        index.add(5, "또잘못된음식", (float("nan"),) * 4)
+        assert [food["food_id"] for food in index.similar(1, 1)] == [2]
@@ -0,0 +1,33 @@
+import asyncio
+
+import httpx
+
+from app import main
+
+"""같은 유저/음식에 동시에 들어온 재고 추가가 하나도 빠지지 않는지 확인"""
+
+PARALLEL_ADDS = 100
+
+
+async def _add_in_parallel(headers: dict, food_id: int) -> list[int]:
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        responses = await asyncio.gather(*(
+            client.post("/inventory", json={"food_id": food_id, "quantity": 1}, headers=headers)
+            for _ in range(PARALLEL_ADDS)
+        ))
+    return [response.status_code for response in responses]
+
+
+def test_parallel_inventory_adds_are_not_lost(client, auth_headers, make_foods):
+    [food_id] = make_foods(1)
+    statuses = asyncio.run(_add_in_parallel(auth_headers, food_id))
+    assert statuses == [200] * PARALLEL_ADDS
+    inventory = client.get("/inventory", headers=auth_headers).json()
+    assert inventory == [{"food_id": food_id, "food_name": inventory[0]["food_name"], "quantity": PARALLEL_ADDS}]
+
+
+def test_add_inventory_for_unknown_food_returns_404(client, auth_headers):
+    response = client.post("/inventory", json={"food_id": 999999, "quantity": 1}, headers=auth_headers)
+    assert response.status_code == 404
+    assert client.get("/inventory", headers=auth_headers).json() == []
@@ -0,0 +1,40 @@
+"""POST /meals/batch: idempotency_key로 중복 저장 방지, 항목별 오류, 현지 날짜별 일별 영양 집계"""
+
+
+def _meal(key: str, food_id: int, quantity: int = 1, when: str = "2024-03-01T12:00:00+09:00") -> dict:
+    return {
+        "idempotency_key": key, "meal_type": "아침", "client_datetime": when,
+        "items": [{"food_id": food_id, "quantity": quantity}],
+    }
+
+
+def _post_batch(client, headers: dict, meals: list[dict]) -> list[dict]:
+    response = client.post("/meals/batch", json={"meals": meals}, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()["results"]
+
+
+def test_meal_batch_skips_duplicates_and_reports_item_errors(client, auth_headers, make_foods):
+    first_food, second_food = make_foods(2)
+    results = _post_batch(client, auth_headers, [
+        _meal("k1", first_food, 2),
+        ## 같은 배치 안의 중복 키는 앞의 식사로 저장
+        _meal("k1", second_food),
+        _meal("k2", second_food, 1, "2024-03-02T08:00:00+09:00"),
+        _meal("k3", 999999),
+        _meal("k4", first_food, 1, "2999-01-01T00:00:00+00:00"),
+    ])
+    assert [result["status"] for result in results] == ["created", "duplicate", "created", "error", "error"]
+    assert results[1]["meal_id"] == results[0]["meal_id"]
+    assert "999999" in results[3]["detail"]
+    assert results[3]["meal_id"] is None and results[4]["meal_id"] is None
+
+    ## 다시 보낸 배치의 이미 저장된 키는 저장하지 않고 처음 저장된 meal_id 반환
+    replay = _post_batch(client, auth_headers, [_meal("k1", second_food), _meal("k5", first_food)])
+    assert [result["status"] for result in replay] == ["duplicate", "created"]
+    assert replay[0]["meal_id"] == results[0]["meal_id"]
+
+    assert len(client.get("/meals", headers=auth_headers).json()) == 3
+    daily = client.get("/nutrition/daily", params={"from": "2024-03-01", "to": "2024-03-02"}, headers=auth_headers).json()
+    ## make_foods의 음식 열량은 100, 101kcal (k1: 100 x 2, k5: 100 x 1 / k2: 101 x 1)
+    assert [(day["date"], day["calories"]) for day in daily] == [("2024-03-01", 300), ("2024-03-02", 101)]
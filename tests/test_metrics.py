@@ -0,0 +1,14 @@
+"""/metrics 출력: 계속 늘어나는 횟수는 counter(_total), 크기/상태는 gauge"""
+
+
+def test_metrics_exposes_monotonic_stats_as_counters(client):
+    lines = client.get("/metrics").text.splitlines()
+    types = dict(line.split()[2:4] for line in lines if line.startswith("# TYPE"))
+    for prefix in ("app_user_cache", "app_recommendation_cache"):
+        assert types[f"{prefix}_hits_total"] == "counter"
+        assert types[f"{prefix}_misses_total"] == "counter"
+        assert types[f"{prefix}_size"] == "gauge"
+        assert f"{prefix}_hits" not in types
+    assert types["app_bcrypt_pool_completed_total"] == "counter"
+    assert types["app_bcrypt_pool_rejected_total"] == "counter"
+    assert types["app_bcrypt_pool_pending"] == "gauge"
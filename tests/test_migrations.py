@@ -0,0 +1,50 @@
+from sqlalchemy import create_engine, select
+
+from app import migrations, models
+
+"""마이그레이션이 기존 데이터를 정리하는지 확인 (서버와 별도의 임시 SQLite 파일 사용)"""
+
+
+def test_food_name_unique_merges_duplicate_foods(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/old.db")
+    foods = models.Food.__table__
+    meal_food = models.MealFood.__table__
+    inventory = models.UserFoodInventory.__table__
+    ## 0003, 0007 이전 상태: 이름/재고 유니크 인덱스 없음
+    models.Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        migrations._table_index(foods, "uq_foods_name").drop(conn)
+        migrations._table_index(inventory, "uq_user_food_inventory_user_id_food_id").drop(conn)
+        conn.execute(models.User.__table__.insert(), [
+            {"user_id": u, "email": f"old{u}@example.com", "hashed_pw": "-", "name": "u", "gender": "M",
+             "height": 170, "weight": 70, "age": 30} for u in (1, 2)
+        ])
+        conn.execute(foods.insert(), [
+            {"food_id": 1, "name": "두부", "calories_per_unit": 80, "allergens": "대두"},
+            {"food_id": 2, "name": "두부", "calories_per_unit": 90, "allergens": "대두, 땅콩"},
+            {"food_id": 3, "name": "김치", "calories_per_unit": 20, "allergens": None},
+        ])
+        conn.execute(models.Meal.__table__.insert(), [{"meal_id": 1, "user_id": 1, "meal_type": "아침"}])
+        conn.execute(meal_food.insert(), [
+            {"meal_id": 1, "food_id": 2, "quantity": 1, "calories": 90},
+            {"meal_id": 1, "food_id": 3, "quantity": 1, "calories": 20},
+        ])
+        conn.execute(inventory.insert(), [
+            {"user_id": 1, "food_id": 1, "quantity": 2},
+            {"user_id": 1, "food_id": 2, "quantity": 3},
+            {"user_id": 2, "food_id": 2, "quantity": 4},
+        ])
+
+    with engine.begin() as conn:
+        migrations._food_name_unique(conn)
+
+    with engine.connect() as conn:
+        assert conn.execute(select(foods.c.food_id, foods.c.allergens).order_by(foods.c.food_id)).all() == [
+            (1, "대두, 땅콩"), (3, None)
+        ]
+        ## 식사 기록은 남는 음식을 가리키고 저장된 영양 성분은 그대로
+        assert sorted(conn.execute(select(meal_food.c.food_id, meal_food.c.calories)).all()) == [(1, 90), (3, 20)]
+        assert sorted(conn.execute(select(inventory.c.user_id, inventory.c.food_id, inventory.c.quantity)).all()) == [
+            (1, 1, 5), (2, 1, 4)
+        ]
+    engine.dispose()
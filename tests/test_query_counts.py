@@ -0,0 +1,45 @@
+"""요청당 SQL 실행 횟수가 행 수와 무관하게 일정한지 확인 (N+1 쿼리 회귀 방지)"""
+
+
+## n개의 재고가 있는 새 유저로 GET /inventory를 호출했을 때 실행된 SQL 문 수
+def _inventory_statements(client, make_user, make_foods, count_statements, n: int) -> int:
+    headers = make_user()
+    items = [{"food_id": food_id, "quantity": 1} for food_id in make_foods(n)]
+    assert client.post("/inventory/bulk", json={"items": items}, headers=headers).status_code == 200
+    ## 유저 정보 캐시가 채워진 상태에서 측정
+    client.get("/inventory", headers=headers)
+    with count_statements() as statements:
+        response = client.get("/inventory", headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()) == n
+    return len(statements)
+
+
+def test_get_inventory_statement_count_does_not_grow_with_rows(client, make_user, make_foods, count_statements):
+    one = _inventory_statements(client, make_user, make_foods, count_statements, 1)
+    many = _inventory_statements(client, make_user, make_foods, count_statements, 200)
+    assert one == many
+
+
+## n개 음식으로 POST /meals, 다른 n개 음식으로 PATCH /meals/edit-meal을 호출했을 때 각각 실행된 SQL 문 수
+def _meal_statements(client, make_user, make_foods, count_statements, n: int) -> tuple[int, int]:
+    headers = make_user()
+    food_ids = make_foods(n * 2)
+    items = [{"food_id": food_id, "quantity": 2} for food_id in food_ids[:n]]
+    with count_statements() as add_statements:
+        response = client.post("/meals", json={"meal_type": "아침", "items": items}, headers=headers)
+    assert response.status_code == 200, response.text
+
+    meal_id = client.get("/meals", headers=headers).json()[0]["meal_id"]
+    items = [{"food_id": food_id, "quantity": 1} for food_id in food_ids[n:]]
+    with count_statements() as edit_statements:
+        response = client.patch("/meals/edit-meal", json={"meal_id": meal_id, "items": items}, headers=headers)
+    assert response.status_code == 200, response.text
+    assert len(client.get("/meals", headers=headers).json()[0]["foods"]) == n
+    return len(add_statements), len(edit_statements)
+
+
+def test_meal_write_statement_count_does_not_grow_with_items(client, make_user, make_foods, count_statements):
+    one = _meal_statements(client, make_user, make_foods, count_statements, 1)
+    many = _meal_statements(client, make_user, make_foods, count_statements, 50)
+    assert one == many